@@ -1,115 +1,171 @@
 #!/usr/bin/env python3
 """xiaoclaw Documentation Generator — auto-generate API docs from source"""
 import ast
+import inspect
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, TextIO
+
+
+def _get_doc(node) -> str:
+    """Return the raw docstring of a module/class/function node, or ""."""
+    body = node.body
+    if body and isinstance(body[0], ast.Expr):
+        value = body[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return value.value
+    return ""
+
+
+def _func_info(node) -> Dict:
+    return {
+        "name": node.name,
+        "args": tuple(a.arg for a in node.args.args if a.arg != "self"),
+        "doc": _get_doc(node),
+        "async": type(node) is ast.AsyncFunctionDef,
+        "line": node.lineno,
+    }
+
+
+def _handle_class(node: ast.ClassDef, info: Dict):
+    public, private = [], []
+    for item in node.body:
+        if type(item) in _FUNC_TYPES:
+            (private if item.name.startswith("_") else public).append(_func_info(item))
+    info["classes"].append({
+        "name": node.name,
+        "doc": _get_doc(node),
+        "public_methods": public,
+        "private_methods": private,
+        "line": node.lineno,
+    })
+
+
+def _handle_func(node, info: Dict):
+    key = "private_functions" if node.name.startswith("_") else "public_functions"
+    info[key].append(_func_info(node))
+
+
+_FUNC_TYPES = frozenset((ast.FunctionDef, ast.AsyncFunctionDef))
+_HANDLERS = {
+    ast.ClassDef: _handle_class,
+    ast.FunctionDef: _handle_func,
+    ast.AsyncFunctionDef: _handle_func,
+}
 
 
 def extract_module_info(filepath: Path) -> Dict:
-    """Extract classes, functions, and docstrings from a Python file."""
+    """Extract classes, functions, and raw docstrings from a Python file."""
     try:
-        source = filepath.read_text(encoding="utf-8")
-        tree = ast.parse(source)
+        # ast.parse decodes bytes itself (honouring PEP 263 cookies)
+        tree = ast.parse(filepath.read_bytes(), filename=str(filepath))
     except Exception as e:
         return {"file": str(filepath), "error": str(e)}
 
     info = {
         "file": str(filepath),
-        "module_doc": ast.get_docstring(tree) or "",
+        "module_doc": _get_doc(tree),
         "classes": [],
-        "functions": [],
+        "public_functions": [],
+        "private_functions": [],
     }
 
-    for node in ast.iter_child_nodes(tree):
-        if isinstance(node, ast.ClassDef):
-            cls = {
-                "name": node.name,
-                "doc": ast.get_docstring(node) or "",
-                "methods": [],
-                "line": node.lineno,
-            }
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    args = [a.arg for a in item.args.args if a.arg != "self"]
-                    cls["methods"].append({
-                        "name": item.name,
-                        "args": args,
-                        "doc": ast.get_docstring(item) or "",
-                        "async": isinstance(item, ast.AsyncFunctionDef),
-                        "line": item.lineno,
-                    })
-            info["classes"].append(cls)
-
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            args = [a.arg for a in node.args.args if a.arg != "self"]
-            info["functions"].append({
-                "name": node.name,
-                "args": args,
-                "doc": ast.get_docstring(node) or "",
-                "async": isinstance(node, ast.AsyncFunctionDef),
-                "line": node.lineno,
-            })
+    for node in tree.body:
+        handler = _HANDLERS.get(type(node))
+        if handler:
+            handler(node, info)
 
     return info
 
 
-def generate_markdown(modules: List[Dict]) -> str:
-    """Generate markdown documentation from extracted module info."""
-    lines = ["# xiaoclaw API Reference\n", "Auto-generated documentation.\n"]
+def _first_line(doc: str) -> str:
+    """First non-blank docstring line, without cleandoc-ing the whole text."""
+    for line in doc.split("\n"):
+        line = line.strip()
+        if line:
+            return line
+    return ""
+
+
+def generate_markdown(modules: List[Dict], out: Optional[TextIO] = None) -> Optional[str]:
+    """Generate markdown documentation from extracted module info.
+
+    Writes into ``out`` when given (returns None), otherwise returns the text.
+    """
+    buf = out if out is not None else io.StringIO()
+    w = buf.write
+    # Every line after the header is written with its leading separator,
+    # so the result matches a "\n".join of the individual lines.
+    w("# xiaoclaw API Reference\n\nAuto-generated documentation.\n")
 
     for mod in modules:
         if "error" in mod:
             continue
-        fname = Path(mod["file"]).name
-        lines.append(f"\n## {fname}\n")
+        w("\n\n## "); w(Path(mod["file"]).name); w("\n")
         if mod["module_doc"]:
-            lines.append(f"{mod['module_doc']}\n")
+            w("\n"); w(inspect.cleandoc(mod["module_doc"])); w("\n")
 
         for cls in mod["classes"]:
-            lines.append(f"\n### class `{cls['name']}`\n")
+            w("\n\n### class `"); w(cls["name"]); w("`\n")
             if cls["doc"]:
-                lines.append(f"{cls['doc']}\n")
-            public_methods = [m for m in cls["methods"] if not m["name"].startswith("_")]
+                w("\n"); w(inspect.cleandoc(cls["doc"])); w("\n")
+            public_methods = cls["public_methods"]
             if public_methods:
-                lines.append("| Method | Args | Description |")
-                lines.append("|--------|------|-------------|")
+                w("\n| Method | Args | Description |\n|--------|------|-------------|")
                 for m in public_methods:
-                    prefix = "async " if m["async"] else ""
-                    args_str = ", ".join(m["args"][:4])
-                    doc = m["doc"].split("\n")[0] if m["doc"] else ""
-                    lines.append(f"| `{prefix}{m['name']}` | `{args_str}` | {doc} |")
-                lines.append("")
-
-        public_funcs = [f for f in mod["functions"] if not f["name"].startswith("_")]
+                    w("\n| `")
+                    if m["async"]:
+                        w("async ")
+                    w(m["name"]); w("` | `"); w(", ".join(m["args"][:4])); w("` | ")
+                    w(_first_line(m["doc"])); w(" |")
+                w("\n")
+
+        public_funcs = mod["public_functions"]
         if public_funcs:
-            lines.append("\n#### Functions\n")
+            w("\n\n#### Functions\n")
             for f in public_funcs:
-                prefix = "async " if f["async"] else ""
-                args_str = ", ".join(f["args"][:4])
-                lines.append(f"- `{prefix}{f['name']}({args_str})` — {f['doc'].split(chr(10))[0] if f['doc'] else ''}")
-            lines.append("")
+                w("\n- `")
+                if f["async"]:
+                    w("async ")
+                w(f["name"]); w("("); w(", ".join(f["args"][:4])); w(")` — ")
+                w(_first_line(f["doc"]))
+            w("\n")
 
-    return "\n".join(lines)
+    return buf.getvalue() if out is None else None
+
+
+def _iter_py(root: Path) -> Iterator[Path]:
+    """Yield documentable .py files under root using one scandir per directory."""
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif name.endswith(".py") and (not name.startswith("_") or name == "__init__.py"):
+                    yield Path(entry.path)
 
 
 def generate_docs(src_dir: str = "xiaoclaw", output: str = "docs/API.md"):
     """Generate documentation for all modules."""
     src = Path(src_dir)
-    modules = []
-    for f in sorted(src.rglob("*.py")):
-        if f.name.startswith("_") and f.name != "__init__.py":
-            continue
-        info = extract_module_info(f)
-        if info.get("classes") or info.get("functions"):
-            modules.append(info)
+    files = sorted(_iter_py(src))
+    # ast.parse is pure CPU work, so fan files out across processes
+    with ProcessPoolExecutor() as ex:
+        infos = list(ex.map(extract_module_info, files, chunksize=8))
+    modules = [info for info in infos
+               if info.get("classes") or info.get("public_functions") or info.get("private_functions")]
 
-    md = generate_markdown(modules)
     out = Path(output)
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(md, encoding="utf-8")
-    print(f"📄 Generated {output} ({len(modules)} modules, {len(md)} chars)")
-    return md
+    with out.open("w", encoding="utf-8", buffering=1 << 16) as fp:
+        generate_markdown(modules, fp)
+    print(f"📄 Generated {output} ({len(modules)} modules, {out.stat().st_size} bytes)")
+    return out
 
 
 if __name__ == "__main__":
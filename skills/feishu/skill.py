@@ -1,65 +1,146 @@
 #!/usr/bin/env python3
 """Feishu Skill — 飞书文档操作"""
 import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger("xiaoclaw.skills.feishu")
 
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
+# requests is imported lazily so loading the skill doesn't pull in
+# requests/urllib3/ssl until a Feishu call is actually made
+_SESSION = None
+# tenant_access_token cache: {"app_id": str, "token": str, "expires_at": float}
+_TOKEN_CACHE: dict = {}
+_skill = None
 
+# Documents are returned truncated, so only the head of the response body is
+# read (up to 4 bytes per char for UTF-8) instead of parsing the whole JSON
+_MAX_CHARS = 2000
+_READ_BYTES = _MAX_CHARS * 4
+# Parallel reads in feishu_doc_batch; matches the session's pool_maxsize
+_BATCH_WORKERS = 8
 
-def feishu_doc(action="read", doc_token="", **kwargs):
-    """飞书文档操作：读取文档内容。"""
-    if not HAS_REQUESTS:
-        return "Error: requests library not installed. pip install requests"
+
+def _get_session():
+    """Shared pooled session so repeated calls reuse the TLS connection."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        _SESSION = requests.Session()
+        _SESSION.mount("https://", HTTPAdapter(
+            pool_connections=4, pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.1),
+        ))
+    return _SESSION
+
+
+def _get_token(app_id: str, app_secret: str) -> str:
+    """Return a cached tenant_access_token, fetching a new one when expired."""
+    if _TOKEN_CACHE.get("app_id") == app_id and time.time() < _TOKEN_CACHE.get("expires_at", 0) - 60:
+        return _TOKEN_CACHE["token"]
+
+    r = _get_session().post(
+        "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+        json={"app_id": app_id, "app_secret": app_secret},
+        timeout=10,
+    )
+    r.raise_for_status()
+    result = r.json()
+
+    # Feishu API returns tenant_access_token at top level, not nested in "data"
+    if result.get("code") != 0:
+        raise ValueError(f"Feishu auth failed (code={result.get('code')}): {result.get('msg', '')}")
+    token = result.get("tenant_access_token", "")
+    if not token:
+        raise ValueError("tenant_access_token not found in response")
+    _TOKEN_CACHE.update(app_id=app_id, token=token,
+                        expires_at=time.time() + result.get("expire", 7200))
+    return token
+
+
+def _auth():
+    """Return (token, error); exactly one of them is set."""
+    try:
+        import requests
+    except ImportError:
+        return None, "Error: requests library not installed. pip install requests"
 
     app_id = os.getenv("FEISHU_APP_ID", "")
     app_secret = os.getenv("FEISHU_APP_SECRET", "")
 
     if not app_id or not app_secret:
-        return "Error: FEISHU_APP_ID and FEISHU_APP_SECRET environment variables are required"
+        return None, "Error: FEISHU_APP_ID and FEISHU_APP_SECRET environment variables are required"
 
-    # Get tenant access token
     try:
-        r = requests.post(
-            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
-            json={"app_id": app_id, "app_secret": app_secret},
-            timeout=10,
-        )
-        r.raise_for_status()
-        result = r.json()
+        return _get_token(app_id, app_secret), None
     except requests.RequestException as e:
-        return f"Error: failed to get Feishu access token: {e}"
+        return None, f"Error: failed to get Feishu access token: {e}"
+    except ValueError as e:
+        return None, f"Error: {e}"
 
-    # Feishu API returns tenant_access_token at top level, not nested in "data"
-    if result.get("code") != 0:
-        return f"Error: Feishu auth failed (code={result.get('code')}): {result.get('msg', '')}"
-    token = result.get("tenant_access_token", "")
-    if not token:
-        return "Error: tenant_access_token not found in response"
 
-    if action == "read" and doc_token:
-        try:
-            r = requests.get(
-                f"https://open.feishu.cn/open-apis/doc/v3/{doc_token}/content",
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=15,
-            )
+def _read_doc(token: str, doc_token: str) -> str:
+    """Read the head of one document."""
+    import requests
+    try:
+        with _get_session().get(
+            f"https://open.feishu.cn/open-apis/doc/v3/{doc_token}/content",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=15,
+            stream=True,
+        ) as r:
             r.raise_for_status()
-            return str(r.json())[:2000]
-        except requests.RequestException as e:
-            return f"Error: failed to read document: {e}"
+            raw = next(r.iter_content(chunk_size=_READ_BYTES), b"")
+        return raw.decode("utf-8", "replace")[:_MAX_CHARS]
+    except requests.RequestException as e:
+        return f"Error: failed to read document: {e}"
+
+
+def feishu_doc(action="read", doc_token="", **kwargs):
+    """飞书文档操作：读取文档内容。"""
+    token, error = _auth()
+    if error:
+        return error
+
+    if action == "read" and doc_token:
+        return _read_doc(token, doc_token)
 
     return "OK"
 
 
+def feishu_doc_batch(doc_tokens="", **kwargs):
+    """批量读取飞书文档：doc_tokens 为逗号分隔的文档 token。"""
+    if isinstance(doc_tokens, str):
+        doc_tokens = [t.strip() for t in doc_tokens.split(",")]
+    doc_tokens = [t for t in doc_tokens if t]
+    if not doc_tokens:
+        return "Error: doc_tokens is required"
+
+    # One token fetch, then the reads run in parallel over the pooled session
+    token, error = _auth()
+    if error:
+        return error
+    with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(doc_tokens))) as pool:
+        texts = pool.map(lambda d: _read_doc(token, d), doc_tokens)
+        return "\n\n".join(f"## {d}\n{text}" for d, text in zip(doc_tokens, texts))
+
+
 def get_skill():
     from xiaoclaw.skills import create_skill
-    return create_skill("feishu", "飞书操作", {"feishu_doc": feishu_doc})
+    return create_skill("feishu", "飞书操作", {
+        "feishu_doc": feishu_doc,
+        "feishu_doc_batch": feishu_doc_batch,
+    })
 
 
-skill = get_skill()
+def __getattr__(name):
+    # Build the skill on first access instead of at import time
+    global _skill
+    if name == "skill":
+        if _skill is None:
+            _skill = get_skill()
+        return _skill
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
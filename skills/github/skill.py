@@ -10,7 +10,9 @@ def gh_run(command: str, **kwargs) -> str:
         # Split command into args to avoid shell injection
         args = ["gh"] + shlex.split(command)
         r = subprocess.run(args, capture_output=True, text=True, timeout=30)
-        return (r.stdout + r.stderr)[:5000]
+        # Truncate before concatenating so huge outputs aren't copied twice
+        out = r.stdout[:5000]
+        return out + r.stderr[:5000 - len(out)]
     except Exception as e:
         return str(e)
 
@@ -18,6 +20,3 @@ def gh_run(command: str, **kwargs) -> str:
 def get_skill():
     from xiaoclaw.skills import create_skill
     return create_skill("github", "GitHub操作", {"gh": gh_run})
-
-
-skill = get_skill()
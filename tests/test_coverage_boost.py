@@ -118,6 +118,41 @@ class TestUtils:
         
         hm = HookManager()
         assert hm is not None
+        
+        calls = []
+        
+        async def slow(**kw):
+            await asyncio.sleep(0.05)
+            calls.append("slow")
+            return "first"
+        
+        async def fast(**kw):
+            calls.append("fast")
+            return "second"
+        
+        def broken(**kw):
+            raise ValueError("boom")
+        
+        for fn in (slow, broken, fast, lambda **kw: calls.append("sync")):
+            hm.register("evt", fn)
+        # Default: in order, stop at the first non-None result
+        assert asyncio.run(hm.fire("evt", x=1)) == "first"
+        assert calls == ["slow"]
+
+        # concurrent=True: later hooks still run, first result still wins
+        calls.clear()
+        assert asyncio.run(hm.fire("evt", concurrent=True, x=1)) == "first"
+        assert calls == ["sync", "fast", "slow"]
+        assert asyncio.run(hm.fire("none")) is None
+
+        async def cancelled(**kw):
+            raise asyncio.CancelledError()
+
+        hm.register("cancel", cancelled)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(hm.fire("cancel"))
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(hm.fire("cancel", concurrent=True))
 
 
 # ─────────────────────────────────────────────────────────────
@@ -197,6 +232,46 @@ class TestCLI:
         
         completer = SlashCompleter()
         assert completer is not None
+        
+        import readline
+        with patch.object(readline, "get_line_buffer", return_value="/se"):
+            assert completer.complete("/se", 0) == "/sessions "
+            assert completer.complete("/se", 1) == "/setup "
+            assert completer.complete("/se", 2) is None
+
+    def test_suggest_commands(self):
+        """Test unknown-command suggestions."""
+        from xiaoclaw.cli import _suggest_commands
+        
+        assert _suggest_commands("/hlep") == ["/help"]
+        assert "/battle-roles" in _suggest_commands("/bat")
+        assert _suggest_commands("/zzz") == []
+
+    def test_parse_argv(self):
+        """Test single-pass argv parsing."""
+        from xiaoclaw.cli import _parse_argv
+        
+        flags, opts = _parse_argv(["--debug", "--config", "a.yaml", "--log-level", "info"])
+        assert flags == {"--debug"}
+        assert opts == {"--config": "a.yaml", "--log-level": "info"}
+        assert _parse_argv(["--config"])[1] == {"--config": None}
+
+    def test_export_session(self):
+        """Test Markdown and JSON session export."""
+        import json
+        from types import SimpleNamespace
+        from xiaoclaw.cli import _export_session
+        
+        msgs = [{"role": "user", "content": "你好"}, {"role": "tool", "content": None}]
+        session = SimpleNamespace(session_id="../exp-test", messages=msgs)
+        md = _export_session(session, "md")
+        assert md.name == "xiaoclaw_export_exp-test.md"
+        assert md.read_text(encoding="utf-8") == "# Session ../exp-test\n\n**user**: 你好\n\n"
+        js = _export_session(session, "json")
+        assert json.loads(js.read_text(encoding="utf-8")) == msgs
+        # Same bytes with or without orjson installed
+        with patch.dict("sys.modules", {"orjson": None}):
+            assert _export_session(session, "json").read_bytes() == js.read_bytes()
 
 
 # ─────────────────────────────────────────────────────────────
@@ -256,6 +331,15 @@ class TestTokenCounting:
         tokens = count_tokens("Hello world")
         assert isinstance(tokens, int)
         assert tokens > 0
+
+    def test_count_tokens_skips_cache_for_large_text(self):
+        """Large texts are counted but never held by the memo cache."""
+        from xiaoclaw.session import count_tokens, _count_tokens_cached, _TOKEN_CACHE_MAX_CHARS
+
+        before = _count_tokens_cached.cache_info().currsize
+        with patch("xiaoclaw.session.HAS_TIKTOKEN", False):
+            assert count_tokens("word " * _TOKEN_CACHE_MAX_CHARS) > 0
+        assert _count_tokens_cached.cache_info().currsize == before
         
     def test_count_messages_tokens(self):
         """Test message token counting."""
@@ -76,6 +76,25 @@ class TestSlackAdapter:
         )
         assert adapter._check_channel("C789") is False
     
+    def test_check_channel_after_reassign(self):
+        """Reassigning allowed_channels takes effect in the checks."""
+        slack_mod = pytest.importorskip("xiaoclaw.adapters.slack_adapter")
+        if not slack_mod.HAS_SLACK:
+            pytest.skip("slack_bolt not installed")
+        
+        from xiaoclaw.adapters.slack_adapter import SlackAdapter
+        
+        adapter = SlackAdapter(
+            app_token="xapp-test",
+            bot_token="xoxb-test",
+            allowed_channels=["C123"],
+        )
+        adapter.allowed_channels = ["C789"]
+        assert adapter._check_channel("C789") is True
+        assert adapter._check_channel("C123") is False
+        adapter.allowed_channels = None
+        assert adapter._check_channel("C123") is True
+    
     def test_check_channel_no_restriction(self):
         """Test channel checking with no restriction."""
         slack_mod = pytest.importorskip("xiaoclaw.adapters.slack_adapter")
@@ -278,6 +297,140 @@ class TestTelegramAdapter:
         assert "New session" in reply_text or "🔄" in reply_text
 
 
+# ─────────────────────────────────────────────────────────────
+# 2b. Feishu Adapter Tests
+# ─────────────────────────────────────────────────────────────
+class _FakeAsyncResponse:
+    def __init__(self, data):
+        self._data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self._data
+
+
+class TestFeishuAdapter:
+    """Test Feishu adapter HTTP handling."""
+
+    def test_send_message_reuses_session_token(self):
+        """Token is fetched once and sent with each request on the pooled session."""
+        from xiaoclaw.adapters.feishu import FeishuAdapter
+
+        adapter = FeishuAdapter(app_id="id", app_secret="secret")
+        session = adapter._get_session()
+        resp = Mock()
+        resp.json.side_effect = [
+            {"code": 0, "tenant_access_token": "T1", "expire": 7200},
+            {"code": 0},
+            {"code": 0},
+        ]
+        session.post = Mock(return_value=resp)
+
+        assert adapter.send_message("ou_1", "hi")["code"] == 0
+        assert adapter.send_message("ou_1", "again")["code"] == 0
+        assert session.post.call_count == 3  # one auth + two sends
+        assert session.post.call_args.kwargs["headers"]["Authorization"] == "Bearer T1"
+        assert "Authorization" not in session.headers
+
+    @pytest.mark.asyncio
+    async def test_sync_send_after_async_token_fetch(self):
+        """A token fetched by the async API is sent by the sync API."""
+        from xiaoclaw.adapters.feishu import FeishuAdapter
+
+        adapter = FeishuAdapter(app_id="id", app_secret="secret")
+        async_session = Mock(closed=False)
+        async_session.post = Mock(return_value=_FakeAsyncResponse(
+            {"code": 0, "tenant_access_token": "T1", "expire": 7200}))
+        adapter._async_session = async_session
+        await adapter.get_tenant_access_token_async()
+
+        session = adapter._get_session()
+        resp = Mock()
+        resp.json.return_value = {"code": 0}
+        session.post = Mock(return_value=resp)
+        assert adapter.send_message("ou_1", "hi")["code"] == 0
+        assert session.post.call_count == 1  # no second token fetch
+        assert session.post.call_args.kwargs["headers"]["Authorization"] == "Bearer T1"
+
+    @pytest.mark.asyncio
+    async def test_send_message_async_refreshes_expired_token(self):
+        """An expired-token reply triggers one refresh and retry."""
+        from xiaoclaw.adapters.feishu import FeishuAdapter, TOKEN_EXPIRED_CODE
+
+        adapter = FeishuAdapter(app_id="id", app_secret="secret")
+        replies = [
+            {"code": 0, "tenant_access_token": "T1"},
+            {"code": TOKEN_EXPIRED_CODE},
+            {"code": 0, "tenant_access_token": "T2"},
+            {"code": 0},
+        ]
+        session = Mock(closed=False)
+        session.post = Mock(side_effect=lambda *a, **kw: _FakeAsyncResponse(replies.pop(0)))
+        adapter._async_session = session
+
+        result = await adapter.send_message_async("ou_1", "hi")
+        assert result == {"code": 0}
+        assert adapter.access_token == "T2"
+        assert session.post.call_args.kwargs["headers"]["Authorization"] == "Bearer T2"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_token_requests_fetch_once(self):
+        """Concurrent callers share one refresh instead of each re-fetching."""
+        from xiaoclaw.adapters.feishu import FeishuAdapter
+
+        adapter = FeishuAdapter(app_id="id", app_secret="secret")
+        session = Mock(closed=False)
+        session.post = Mock(return_value=_FakeAsyncResponse(
+            {"code": 0, "tenant_access_token": "T1", "expire": 7200}))
+        adapter._async_session = session
+
+        tokens = await asyncio.gather(*(adapter.get_tenant_access_token_async() for _ in range(5)))
+        assert tokens == ["T1"] * 5
+        assert session.post.call_count == 1
+        assert adapter._is_token_valid()
+
+
+class TestFeishuSkill:
+    def test_doc_batch_fetches_token_once(self, monkeypatch):
+        """feishu_doc_batch authenticates once and reads every document."""
+        import importlib.util
+        from pathlib import Path
+
+        path = Path(__file__).parent.parent / "skills" / "feishu" / "skill.py"
+        spec = importlib.util.spec_from_file_location("feishu_skill_test", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        monkeypatch.setenv("FEISHU_APP_ID", "id")
+        monkeypatch.setenv("FEISHU_APP_SECRET", "secret")
+
+        auth = Mock()
+        auth.json.return_value = {"code": 0, "tenant_access_token": "T1", "expire": 7200}
+
+        def get(url, **kwargs):
+            resp = MagicMock()
+            resp.__enter__.return_value = resp
+            resp.iter_content.return_value = iter([url.split("/")[-2].encode()])
+            return resp
+
+        session = Mock()
+        session.post = Mock(return_value=auth)
+        session.get = Mock(side_effect=get)
+        mod._SESSION = session
+
+        result = mod.feishu_doc_batch(doc_tokens="a, b,c")
+        assert result == "## a\na\n\n## b\nb\n\n## c\nc"
+        assert session.post.call_count == 1
+        assert session.get.call_count == 3
+        assert all(c.kwargs["headers"]["Authorization"] == "Bearer T1"
+                   for c in session.get.call_args_list)
+        assert "feishu_doc_batch" in mod.get_skill().tools
+
+
 # ─────────────────────────────────────────────────────────────
 # 3. WebUI Tests
 # ─────────────────────────────────────────────────────────────
@@ -315,6 +468,33 @@ class TestWebUI:
             pytest.skip("WebUI routes not available")
 
 
+class TestAPIStream:
+    async def _collect(self, sse):
+        from xiaoclaw.api import _stream_body
+
+        async def chunks():
+            for c in ("Hel", "lo\n", "\"x\""):
+                yield c
+
+        return [part async for part in _stream_body(chunks(), sse=sse)]
+
+    @pytest.mark.asyncio
+    async def test_plain_stream_is_default(self):
+        """Without SSE the chunks go out unchanged, as text/plain."""
+        assert await self._collect(sse=False) == ["Hel", "lo\n", "\"x\""]
+
+    @pytest.mark.asyncio
+    async def test_sse_wire_format(self):
+        """SSE: one JSON data event per chunk, then a final done event."""
+        body = b"".join(await self._collect(sse=True))
+        assert body == (
+            b'data: "Hel"\n\n'
+            b'data: "lo\\n"\n\n'
+            b'data: "\\"x\\""\n\n'
+            b"event: done\ndata: [DONE]\n\n"
+        )
+
+
 # ─────────────────────────────────────────────────────────────
 # 4. Type Annotation Tests (verify annotations work)
 # ─────────────────────────────────────────────────────────────
@@ -18,6 +18,15 @@ def tmp_workspace():
 
 
 @pytest.fixture
+def analytics(tmp_workspace):
+    """Analytics writing to a temp dir; closed (writer thread stopped) afterwards."""
+    from xiaoclaw.analytics import Analytics
+    a = Analytics(stats_dir=tmp_workspace)
+    yield a
+    a.close()
+
+
+@pytest.fixture(scope="module")
 def config():
     from xiaoclaw.core import XiaClawConfig
     return XiaClawConfig(debug=True, security_level="strict", workspace="/tmp/test_xiaoclaw")
@@ -29,6 +38,13 @@ def claw(config):
     return XiaClaw(config)
 
 
+@pytest.fixture(scope="module")
+def claw_ro(config):
+    """Shared instance for tests that don't change agent state."""
+    from xiaoclaw.core import XiaClaw
+    return XiaClaw(config)
+
+
 # ─── Core Tests ───────────────────────────────────────
 
 class TestConfig:
@@ -47,14 +63,14 @@ class TestConfig:
 
 
 class TestSecurity:
-    def test_dangerous_commands(self, claw):
-        assert claw.security.is_dangerous("rm -rf /")
-        assert claw.security.is_dangerous("dd if=/dev/zero")
-        assert not claw.security.is_dangerous("ls -la")
-        assert not claw.security.is_dangerous("echo hello")
-
-    def test_audit_log(self, claw):
-        claw.security.log_tool_call("exec", {"command": "ls"})
+    def test_dangerous_commands(self, claw_ro):
+        assert claw_ro.security.is_dangerous("rm -rf /")
+        assert claw_ro.security.is_dangerous("dd if=/dev/zero")
+        assert not claw_ro.security.is_dangerous("ls -la")
+        assert not claw_ro.security.is_dangerous("echo hello")
+
+    def test_audit_log(self, claw_ro):
+        claw_ro.security.log_tool_call("exec", {"command": "ls"})
         # Should not raise
 
 
@@ -87,17 +103,26 @@ class TestTokenStats:
         assert stats.requests == 0
 
 
+def test_chunk_text():
+    from xiaoclaw.utils import chunk_text
+    text = "a" * 4500
+    chunks = list(chunk_text(text, 2000))
+    assert [len(c) for c in chunks] == [2000, 2000, 500]
+    assert "".join(chunks) == text
+    assert list(chunk_text("", 2000)) == []
+
+
 # ─── Tools Tests ──────────────────────────────────────
 
 class TestTools:
-    def test_list_tools(self, claw):
-        names = claw.tools.list_names()
+    def test_list_tools(self, claw_ro):
+        names = claw_ro.tools.list_names()
         assert "read" in names
         assert "write" in names
         assert "exec" in names
 
-    def test_read_file(self, claw):
-        result = claw.tools.call("read", {"file_path": "/etc/hostname"})
+    def test_read_file(self, claw_ro):
+        result = claw_ro.tools.call("read", {"file_path": "/etc/hostname"})
         assert "Error" not in result or len(result) > 0
 
     def test_write_read(self, claw):
@@ -106,16 +131,44 @@ class TestTools:
         result = claw.tools.call("read", {"file_path": "/tmp/test_xc.txt"})
         assert "hello" in result
 
-    def test_exec(self, claw):
-        result = claw.tools.call("exec", {"command": "echo test123"})
+    def test_read_pages_large_file(self, tmp_path):
+        from xiaoclaw.tools import ToolRegistry, _READ_MAX_CHARS
+        from xiaoclaw.utils import SecurityManager
+        tools = ToolRegistry(SecurityManager(), workspace=tmp_path)
+        big = tmp_path / "big.txt"
+        line = "x" * 99 + "\n"
+        big.write_text(line * (_READ_MAX_CHARS // 100 + 50))
+
+        first = tools.call("read", {"file_path": str(big)})
+        kept = _READ_MAX_CHARS // 100
+        assert first.startswith(line * kept) and f"offset={kept + 1} to continue" in first
+        rest = tools.call("read", {"file_path": str(big), "offset": kept + 1})
+        assert rest == line * 50
+        assert tools.call("read", {"file_path": str(big), "offset": 3, "limit": 2}) == line * 2
+        assert tools.call("read", {"file_path": str(big), "offset": "x"}).startswith("Error:")
+
+        wide = tmp_path / "wide.txt"
+        wide.write_text("y" * (_READ_MAX_CHARS + 10) + "\nnext\n")
+        cut = tools.call("read", {"file_path": str(wide)})
+        assert cut.startswith("y" * _READ_MAX_CHARS) and "line 1 truncated" in cut
+        assert "offset=2 for the next line" in cut
+
+    def test_exec(self, claw_ro):
+        result = claw_ro.tools.call("exec", {"command": "echo test123"})
         assert "test123" in result
 
-    def test_exec_blocked(self, claw):
-        result = claw.tools.call("exec", {"command": "rm -rf /"})
+    def test_exec_blocked(self, claw_ro):
+        result = claw_ro.tools.call("exec", {"command": "rm -rf /"})
         assert "Blocked" in result
 
-    def test_unknown_tool(self, claw):
-        result = claw.tools.call("nonexistent", {})
+    @pytest.mark.asyncio
+    async def test_exec_async(self, claw_ro):
+        assert "test123" in await claw_ro.tools.acall("exec", {"command": "echo test123 1>&2"})
+        assert "Blocked" in await claw_ro.tools.acall("exec", {"command": "rm -rf /"})
+        assert "Error" in await claw_ro.tools.acall("nonexistent", {})
+
+    def test_unknown_tool(self, claw_ro):
+        result = claw_ro.tools.call("nonexistent", {})
         assert "Error" in result
 
     def test_disable_enable(self, claw):
@@ -126,6 +179,20 @@ class TestTools:
         claw.tools.enable_tool("exec")
         assert "exec" in claw.tools.list_names()
 
+    def test_version_bumps(self, claw):
+        v = claw.tools.version
+        claw.tools.disable_tool("exec")
+        claw.tools.enable_tool("exec")
+        claw.tools.register_tool("noop", lambda **kw: "", "No-op", {})
+        assert claw.tools.version == v + 3
+
+    def test_prompt_cache_follows_tools(self, claw):
+        assert "late_tool" not in claw._system_prompt()
+        claw._get_openai_functions()
+        claw.tools.register_tool("late_tool", lambda **kw: "", "Late", {"type": "object", "properties": {}})
+        assert "late_tool" in claw._system_prompt()
+        assert any(f["function"]["name"] == "late_tool" for f in claw._get_openai_functions())
+
 
 # ─── Session Tests ────────────────────────────────────
 
@@ -197,6 +264,22 @@ class TestMemory:
         today = datetime.now().strftime("%Y-%m-%d")
         assert "something" in mem.read_daily(today)
 
+    def test_bootstrap_cache(self, tmp_workspace):
+        import os
+        from xiaoclaw.core import _bootstrap_key, _render_bootstrap
+        from xiaoclaw.memory import MemoryManager
+        mem = MemoryManager(workspace=tmp_workspace)
+        (tmp_workspace / "SOUL.md").write_text("calm")
+        mem.append_daily("- Did something")
+        text = _render_bootstrap(*_bootstrap_key(mem))
+        assert "## SOUL.md\ncalm" in text and "something" in text
+        hits = _render_bootstrap.cache_info().hits
+        assert _render_bootstrap(*_bootstrap_key(mem)) == text
+        assert _render_bootstrap.cache_info().hits == hits + 1
+        (tmp_workspace / "SOUL.md").write_text("restless")
+        os.utime(tmp_workspace / "SOUL.md", ns=(0, 0))
+        assert "restless" in _render_bootstrap(*_bootstrap_key(mem))
+
 
 # ─── Provider Tests ───────────────────────────────────
 
@@ -245,6 +328,16 @@ class TestSkills:
         assert "keyword1" in meta.read_when
         assert "tool1" in meta.tools
 
+    def test_create_skill_jit(self):
+        from xiaoclaw.skills import create_skill
+        def total(n):
+            s = 0
+            for i in range(n):
+                s += i
+            return s
+        skill = create_skill("sum", "Sum", {"total": total}, jit=True)
+        assert skill.tools["total"](10) == 45
+
 
 # ─── i18n Tests ───────────────────────────────────────
 
@@ -316,6 +409,41 @@ class TestIntegration:
         reply = await claw.handle_message("工具列表")
         assert "read" in reply or "工具" in reply or "tools" in reply.lower()
 
+    @pytest.mark.asyncio
+    async def test_compact_keeps_tail(self, claw, monkeypatch):
+        monkeypatch.setattr("xiaoclaw.core.count_messages_tokens", lambda msgs: 10 ** 9)
+        for i in range(20):
+            claw.session.add_message("user" if i % 2 == 0 else "assistant", f"msg {i}")
+        await claw._compact()
+        msgs = claw.session.messages
+        assert len(msgs) == 5
+        assert msgs[0]["role"] == "system"
+        assert msgs[0]["content"].splitlines()[1:] == [
+            f"{'user' if i % 2 == 0 else 'assistant'}: msg {i}" for i in range(6, 16)]
+        assert [m["content"] for m in msgs[1:]] == ["msg 16", "msg 17", "msg 18", "msg 19"]
+
+    @pytest.mark.asyncio
+    async def test_hook_task_cancelled_when_setup_fails(self, claw, monkeypatch):
+        started = asyncio.Event()
+
+        async def hook(**kw):
+            started.set()
+            await asyncio.sleep(10)
+
+        async def broken_compact():
+            await started.wait()
+            raise RuntimeError("compact failed")
+
+        tasks = []
+        start_hooks = claw._start_message_hooks
+        monkeypatch.setattr(claw, "_start_message_hooks", lambda m: tasks.append(start_hooks(m)) or tasks[-1])
+        claw.hooks.register("message_received", hook)
+        monkeypatch.setattr(claw, "_compact", broken_compact)
+        with pytest.raises(RuntimeError):
+            await claw.handle_message("hi")
+        await asyncio.wait(tasks, timeout=1)
+        assert tasks[0].cancelled()
+
     def test_health_check(self, claw):
         health = claw.health_check()
         assert health["status"] == "ok"
@@ -406,12 +534,8 @@ def test_i18n_missing_placeholder():
 
 # ─── Analytics Tests ───────────────────────────────────
 
-def test_analytics_flush():
+def test_analytics_flush(analytics):
     """Analytics should have explicit flush method."""
-    from xiaoclaw.analytics import Analytics
-    
-    analytics = Analytics()
-    
     # Should have flush method
     assert hasattr(analytics, 'flush')
     assert callable(analytics.flush)
@@ -420,13 +544,8 @@ def test_analytics_flush():
     analytics.flush()
 
 
-def test_analytics_specific_exceptions():
+def test_analytics_specific_exceptions(analytics):
     """Analytics should catch specific exceptions."""
-    from xiaoclaw.analytics import Analytics
-    import json
-    
-    analytics = Analytics()
-    
     # Recording should work
     analytics.record(
         model="test",
@@ -442,6 +561,216 @@ def test_analytics_specific_exceptions():
     assert stats is None  # No data for that date
 
 
+def test_analytics_incremental_summary(analytics, tmp_workspace):
+    """Each flush appends records and merges into the day's summary."""
+    from datetime import datetime
+    from xiaoclaw.analytics import Analytics
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    for i in range(3):
+        analytics.record("m1", "p1", 10, 5, duration_ms=100, success=True)
+        analytics.flush()
+    analytics.record("m2", "p1", 1, 1, duration_ms=400, success=False, error="boom")
+    analytics.flush()
+
+    lines = (tmp_workspace / f"records_{today}.jsonl").read_text().splitlines()
+    assert len(lines) == 4
+
+    daily = analytics.get_daily_stats(today)
+    assert daily.total_calls == 4
+    assert daily.failed_calls == 1
+    assert daily.total_tokens == 47
+    assert daily.avg_duration_ms == 175
+    assert daily.models["m1"] == {"calls": 3, "tokens": 45, "input": 30, "output": 15}
+    assert daily.errors[-1]["error"] == "boom"
+
+    # A fresh instance reads the same summary from disk
+    assert Analytics(stats_dir=tmp_workspace).get_daily_stats(today) == daily
+
+
+def test_analytics_close_writes_pending(analytics):
+    """record() only enqueues; close() drains the queue to disk."""
+    from datetime import datetime
+
+    analytics.record("m", "p", 1, 2, duration_ms=10, success=True)
+    analytics.close()
+    assert not analytics._writer.is_alive()
+    today = datetime.now().strftime("%Y-%m-%d")
+    assert analytics.get_daily_stats(today).total_calls == 1
+
+    # After close() records are written synchronously instead of dropped
+    analytics.record("m", "p", 1, 2, duration_ms=10, success=True)
+    assert analytics.get_daily_stats(today).total_calls == 2
+    assert analytics._db is None
+
+
+def test_analytics_writer_starts_lazily(analytics):
+    """No writer thread (or atexit hook) until something is recorded."""
+    assert analytics._writer is None
+    analytics.close()
+    assert analytics._writer is None
+
+
+def test_analytics_reads_legacy_stats_file(tmp_workspace):
+    """Pre-split stats_<date>.json files are still reported."""
+    import json
+    from xiaoclaw.analytics import Analytics
+
+    summary = {
+        "date": "2024-01-02", "total_calls": 2, "success_calls": 2, "failed_calls": 0,
+        "total_input_tokens": 3, "total_output_tokens": 4, "total_tokens": 7,
+        "avg_duration_ms": 50.0, "models": {"m": {"calls": 2, "tokens": 7, "input": 3, "output": 4}},
+        "providers": {"p": {"calls": 2, "tokens": 7}}, "errors": [],
+    }
+    (tmp_workspace / "stats_2024-01-02.json").write_text(json.dumps({"records": [], "summary": summary}))
+
+    stats = Analytics(stats_dir=tmp_workspace).get_range_stats("2024-01-01", "2024-01-03")
+    assert stats["totals"]["calls"] == 2
+    assert stats["by_model"]["m"]["tokens"] == 7
+
+
+def test_analytics_range_uses_sqlite_index(analytics, tmp_workspace):
+    """Fully indexed days are aggregated in SQLite; partly indexed ones use the summary."""
+    import sqlite3
+    from xiaoclaw.analytics import CallRecord
+
+    for date, ts in (("2024-03-01", 1709251200.0), ("2024-03-02", 1709337600.0)):
+        with analytics._lock:
+            analytics._save_daily_records(date, [
+                CallRecord(ts, "m", "p", 10, 5, 15, 100, True),
+                CallRecord(ts, "m2", "p", 1, 1, 2, 300, False, "boom"),
+            ])
+    analytics.close()
+
+    indexed = analytics._query_range("2024-03-01", "2024-03-02")
+    assert sorted(indexed) == ["2024-03-01", "2024-03-02"]
+    assert indexed["2024-03-02"].models["m"] == {"calls": 1, "tokens": 15, "input": 10, "output": 5}
+    assert indexed["2024-03-02"].avg_duration_ms == 200
+
+    # Lose one indexed row, as after a failed insert
+    db = sqlite3.connect(tmp_workspace / "analytics.sqlite")
+    with db:
+        db.execute("DELETE FROM calls WHERE date = '2024-03-01' AND model = 'm2'")
+    db.close()
+
+    stats = analytics.get_range_stats("2024-03-01", "2024-03-02")
+    assert stats["totals"]["calls"] == 4
+    assert stats["totals"]["failed"] == 2
+    assert stats["by_provider"]["p"] == {"calls": 4, "tokens": 34}
+
+
+# ─── Battle Tests ─────────────────────────────────────
+
+def _fake_battle_provider():
+    from types import SimpleNamespace
+
+    async def create(model, messages, max_tokens):
+        content = f"<think>...</think>opinion from {messages[0]['content'][:4]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    completions = SimpleNamespace(create=create)
+    return SimpleNamespace(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                           current_model="fake")
+
+
+def test_battle_wrapper_sync_call():
+    """BattleToolWrapper runs the engine on its shared background loop."""
+    from xiaoclaw.battle import BattleToolWrapper
+    from xiaoclaw.utils import background_loop
+
+    wrapper = BattleToolWrapper(_fake_battle_provider())
+    out = wrapper.battle(question="Q?", roles="ceo,dev")
+    assert "opinion from" in out and "<think>" not in out
+    loop = background_loop()
+    assert wrapper.battle_custom(question="Q?", roles_json='[{"name": "X", "prompt": "p"}]')
+    assert background_loop() is loop
+
+
+@pytest.mark.asyncio
+async def test_battle_concurrency_limit():
+    """Role calls are bounded by concurrency_limit and keep role order."""
+    from xiaoclaw.battle import BattleEngine
+
+    provider = _fake_battle_provider()
+    active = peak = 0
+    create = provider.client.chat.completions.create
+
+    async def slow_create(**kw):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return await create(**kw)
+
+    provider.client.chat.completions.create = slow_create
+    seen = []
+    result = await BattleEngine(provider, concurrency_limit=2).battle(
+        "Q?", role_keys=["ceo", "cto", "pm", "dev", "qa"], on_opinion=seen.append)
+    assert peak == 2
+    assert [o["name"] for o in result["opinions"]] == ["CEO", "CTO", "产品经理", "高级开发", "QA"]
+    assert len(seen) == 5
+
+
+@pytest.mark.asyncio
+async def test_battle_role_cache():
+    """With a cache, re-asking (modulo whitespace/case) reuses role answers; without, it re-debates."""
+    from xiaoclaw.battle import BattleEngine, ResponseCache
+
+    provider = _fake_battle_provider()
+    calls = []
+    create = provider.client.chat.completions.create
+
+    async def counting_create(**kw):
+        calls.append(kw["messages"][0]["content"])
+        return await create(**kw)
+
+    provider.client.chat.completions.create = counting_create
+    engine = BattleEngine(provider, cache=ResponseCache())
+    first = await engine.battle("Ship it now?", role_keys=["ceo", "dev"])
+    n = len(calls)
+    second = await engine.battle("  ship IT now? ", role_keys=["ceo", "dev"])
+    assert second["opinions"] == first["opinions"]
+    assert len(calls) == n + 1  # only the moderator is asked again
+
+    engine = BattleEngine(provider)
+    await engine.battle("Ship it now?", role_keys=["ceo", "dev"])
+    calls.clear()
+    await engine.battle("Ship it now?", role_keys=["ceo", "dev"])
+    assert len(calls) == n  # default: every role asked again
+
+
+@pytest.mark.asyncio
+async def test_battle_prompt_cache_across_engines(tmp_workspace):
+    """With a PromptCache, identical requests are answered from disk by a new engine."""
+    from xiaoclaw.battle import BattleEngine, PromptCache
+
+    provider = _fake_battle_provider()
+    calls = []
+    create = provider.client.chat.completions.create
+
+    async def counting_create(**kw):
+        calls.append(kw)
+        return await create(**kw)
+
+    provider.client.chat.completions.create = counting_create
+    cache = PromptCache(tmp_workspace / "llm")
+    first = await BattleEngine(provider, prompt_cache=cache).battle("Q?", role_keys=["qa"])
+    n = len(calls)
+    second = await BattleEngine(provider, prompt_cache=cache).battle("Q?", role_keys=["qa"])
+    assert len(calls) == n  # role + moderator both cached
+    assert second["formatted"] == first["formatted"]
+
+
+@pytest.mark.asyncio
+async def test_battle_wrapper_inside_running_loop():
+    """Calling the sync wrapper from async code must not nest event loops."""
+    from xiaoclaw.battle import BattleToolWrapper
+
+    out = BattleToolWrapper(_fake_battle_provider()).battle(question="Q?")
+    assert "结论" in out
+
+
 # ─── Subagent Tests ───────────────────────────────────
 
 @pytest.mark.asyncio
@@ -520,6 +849,17 @@ def test_security_regex_patterns():
     assert not security.is_dangerous("wget https://example.com/file.tar.gz")
 
 
+def test_security_case_insensitive():
+    """Exact patterns match regardless of case, including mixed-case ones."""
+    from xiaoclaw.utils import SecurityManager
+
+    security = SecurityManager(level="strict")
+
+    assert security.is_dangerous("RM -RF /tmp/x")
+    assert security.is_dangerous("chmod -R 777 /")
+    assert not security.is_dangerous("chmod 644 notes.txt")
+
+
 def test_ssrf_blocks_zero_address():
     """SSRF protection should block 0.0.0.0."""
     from xiaoclaw.web import _is_internal_url
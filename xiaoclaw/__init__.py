@@ -1,14 +1,37 @@
 """xiaoclaw - Lightweight AI Agent compatible with OpenClaw"""
 
-from .core import XiaClaw, XiaClawConfig, VERSION
-from .utils import SecurityManager, RateLimiter, TokenStats, HookManager
-from .providers import ProviderManager, ProviderConfig
-from .session import Session, SessionManager
-from .memory import MemoryManager
-from .skills import SkillRegistry, Skill
-from .web import web_search, web_fetch
-from .plugins import PluginManager
-from .battle import BattleEngine, BattleToolWrapper, PRESET_ROLES
+import importlib
+
+from ._version import VERSION
+
+# Public names → defining submodule; imported on first attribute access (PEP 562)
+# so `import xiaoclaw` / `xiaoclaw --version` don't load openai, httpx and the tool code
+_LAZY = {
+    "XiaClaw": ".core", "XiaClawConfig": ".core",
+    "SecurityManager": ".utils", "RateLimiter": ".utils", "TokenStats": ".utils", "HookManager": ".utils",
+    "ProviderManager": ".providers", "ProviderConfig": ".providers",
+    "Session": ".session", "SessionManager": ".session",
+    "MemoryManager": ".memory",
+    "SkillRegistry": ".skills", "Skill": ".skills",
+    "web_search": ".web", "web_fetch": ".web",
+    "PluginManager": ".plugins",
+    "BattleEngine": ".battle", "BattleToolWrapper": ".battle", "PRESET_ROLES": ".battle",
+}
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY.keys())
+
 
 __version__ = VERSION
 __all__ = [
@@ -0,0 +1,2 @@
+"""Package version — kept import-free so `xiaoclaw --version/--help` stay cheap."""
+VERSION = "0.3.1"
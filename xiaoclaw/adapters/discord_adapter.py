@@ -3,6 +3,8 @@ import os
 import logging
 from typing import Optional, TYPE_CHECKING
 
+from ..utils import chunk_text, install_uvloop
+
 logger = logging.getLogger("xiaoclaw.Discord")
 
 try:
@@ -27,11 +29,26 @@ class DiscordAdapter:
         self.claw = None
         # Per-user session storage
         self._sessions: dict = {}
+        # Bot mention tokens (<@id> and nickname form <@!id>), set in on_ready
+        self._mention_tokens: tuple = ()
+        # (tools.version, joined tool names) for the tools command
+        self._tools_cache: Optional[tuple] = None
+
+    @property
+    def allowed_channels(self) -> Optional[list]:
+        """Channel IDs the bot answers in (None = allow all)."""
+        return self._allowed_channels_list
+
+    @allowed_channels.setter
+    def allowed_channels(self, channels: Optional[list]):
+        # Checks use the frozenset; assigning here keeps the two in step
+        self._allowed_channels_list = channels
+        self._allowed_channels = None if channels is None else frozenset(channels)
 
     def _check_channel(self, channel_id: int) -> bool:
-        if self.allowed_channels is None:
+        if self._allowed_channels is None:
             return True
-        return channel_id in self.allowed_channels
+        return channel_id in self._allowed_channels
 
     def start(self, claw):
         """Start the Discord bot (blocking). Pass a XiaClaw instance."""
@@ -47,6 +64,7 @@ class DiscordAdapter:
 
         @bot.event
         async def on_ready():
+            self._mention_tokens = (f"<@{bot.user.id}>", f"<@!{bot.user.id}>")
             logger.info(f"Discord bot ready: {bot.user}")
 
         @bot.event
@@ -55,7 +73,8 @@ class DiscordAdapter:
                 return
             if message.author == bot.user:
                 return
-            if not self._check_channel(message.channel.id):
+            allowed = self._allowed_channels
+            if allowed is not None and message.channel.id not in allowed:
                 return
 
             # Handle commands
@@ -69,7 +88,10 @@ class DiscordAdapter:
             if not is_dm and not is_mentioned:
                 return
 
-            text = message.content.replace(f"<@{bot.user.id}>", "").strip()
+            text = message.content
+            for token in self._mention_tokens:
+                text = text.replace(token, "")
+            text = text.strip()
             if not text:
                 return
 
@@ -91,8 +113,8 @@ class DiscordAdapter:
                     self.claw.session = old_session
 
                 # Discord has 2000 char limit
-                for i in range(0, len(reply), 1900):
-                    await message.reply(reply[i:i + 1900])
+                for chunk in chunk_text(reply, 1900):
+                    await message.reply(chunk)
             except Exception as e:
                 logger.error(f"Discord handle error: {e}")
                 await message.reply("❌ Something went wrong, please try again.")
@@ -101,8 +123,10 @@ class DiscordAdapter:
         async def cmd_tools(ctx):
             if not self.claw or not self._check_channel(ctx.channel.id):
                 return
-            tools = ", ".join(self.claw.tools.list_names())
-            await ctx.send(f"🔧 Tools: {tools}")
+            ver = self.claw.tools.version
+            if self._tools_cache is None or self._tools_cache[0] != ver:
+                self._tools_cache = (ver, ", ".join(self.claw.tools.list_names()))
+            await ctx.send(f"🔧 Tools: {self._tools_cache[1]}")
 
         @bot.command(name="clear")
         async def cmd_clear(ctx):
@@ -121,6 +145,7 @@ class DiscordAdapter:
                 return
             await ctx.send(self.claw.stats.summary())
 
+        install_uvloop()
         bot.run(self.token)
 
 
@@ -5,12 +5,27 @@ Feishu Adapter - 飞书集成
 
 import os
 import json
+import asyncio
 import logging
+import threading
 import time
 from typing import Dict, Optional
 
 logger = logging.getLogger("xiaoclaw.Feishu")
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+TOKEN_URL = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+MESSAGE_URL = "https://open.feishu.cn/open-apis/im/v1/messages"
+MESSAGE_PARAMS = {"receive_id_type": "open_id"}
+TOKEN_EXPIRED_CODE = 99991663
+
 
 class FeishuAdapter:
     """飞书适配器"""
@@ -22,81 +37,147 @@ class FeishuAdapter:
         self.app_secret = app_secret or os.getenv("FEISHU_APP_SECRET", "")
         self.verification_token = verification_token or os.getenv("FEISHU_VERIFICATION_TOKEN", "")
         self.access_token: Optional[str] = None
-        self._token_expires_at: float = 0  # Token expiry timestamp
+        self._token_expires_at: float = 0  # time.monotonic() deadline, 60s before real expiry
+        # Serialize refreshes so concurrent callers don't all hit the auth endpoint
+        self._token_lock = threading.Lock()
+        self._async_token_lock: Optional[asyncio.Lock] = None
+        self._session = None  # pooled requests.Session, created on first call
+        self._async_session = None  # aiohttp.ClientSession for the *_async API
+
+    def _get_session(self):
+        """Keep-alive session shared by all calls from this adapter."""
+        if self._session is None:
+            if not HAS_REQUESTS:
+                raise RuntimeError("requests not installed. pip install requests")
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(
+                pool_connections=10, pool_maxsize=20,
+                max_retries=Retry(total=2, backoff_factor=0.2),
+            ))
+        return self._session
     
     def _is_token_valid(self) -> bool:
         """Check if the cached token is still valid."""
-        return self.access_token and time.time() < self._token_expires_at - 60  # 60s buffer
-        
-    def get_tenant_access_token(self, force_refresh: bool = False) -> str:
-        """获取 tenant_access_token"""
-        import requests
-        
-        # Return cached token if valid
-        if not force_refresh and self._is_token_valid():
-            return self.access_token
+        return bool(self.access_token) and time.monotonic() < self._token_expires_at
         
+    def _check_credentials(self):
         if not self.app_id or not self.app_secret:
             raise ValueError(
                 "飞书 app_id 和 app_secret 未配置。"
                 "请设置环境变量 FEISHU_APP_ID 和 FEISHU_APP_SECRET"
             )
-        
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-        data = {
-            "app_id": self.app_id,
-            "app_secret": self.app_secret
-        }
-        
-        response = requests.post(url, json=data, timeout=10)
-        result = response.json()
-        
+
+    def _credentials(self) -> Dict:
+        return {"app_id": self.app_id, "app_secret": self.app_secret}
+
+    def _store_token(self, result: Dict) -> str:
+        """Cache the token from a tenant_access_token response."""
         if result.get("code") == 0:
             self.access_token = result.get("tenant_access_token", "")
             expire = result.get("expire", 7200)  # Default 2 hours
-            self._token_expires_at = time.time() + expire
+            self._token_expires_at = time.monotonic() + expire - 60  # 60s buffer
             if not self.access_token:
                 raise Exception(f"Token field missing in response: {result}")
             return self.access_token
         else:
             raise Exception(f"Failed to get token (code={result.get('code')}): {result.get('msg', result)}")
-    
-    def send_message(self, receive_id: str, message: str) -> Dict:
-        """发送消息"""
-        import requests
-        
-        # Get fresh token (will auto-refresh if expired)
-        self.get_tenant_access_token()
-        
-        url = "https://open.feishu.cn/open-apis/im/v1/messages"
-        params = {
-            "receive_id_type": "open_id"
-        }
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
-        data = {
+
+    @staticmethod
+    def _message_body(receive_id: str, message: str) -> Dict:
+        return {
             "receive_id": receive_id,
             "msg_type": "text",
             "content": json.dumps({"text": message})
         }
-        
-        response = requests.post(url, params=params, headers=headers, json=data)
-        result = response.json()
-        
-        # Check for errors
-        if result.get("code") != 0:
+
+    def get_tenant_access_token(self, force_refresh: bool = False) -> str:
+        """获取 tenant_access_token"""
+        # Return cached token if valid
+        if not force_refresh and self._is_token_valid():
+            return self.access_token
+        self._check_credentials()
+
+        stale = self.access_token
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.access_token != stale and self._is_token_valid():
+                return self.access_token
+            session = self._get_session()
+            response = session.post(TOKEN_URL, json=self._credentials(), timeout=10)
+            return self._store_token(response.json())
+    
+    def send_message(self, receive_id: str, message: str) -> Dict:
+        """发送消息"""
+        data = self._message_body(receive_id, message)
+        session = self._get_session()
+        for attempt in range(2):
+            # Token goes on each request rather than on the shared session, so
+            # a refresh made by the async API is picked up here too
+            token = self.get_tenant_access_token(force_refresh=attempt > 0)
+            response = session.post(MESSAGE_URL, params=MESSAGE_PARAMS, json=data, timeout=10,
+                                    headers={"Authorization": f"Bearer {token}"})
+            result = response.json()
+            if result.get("code") == 0:
+                break
             logger.error(f"Feishu send_message error: {result}")
             # If token expired, force refresh and retry once
-            if result.get("code") == 99991663:  # Token expired
-                self.get_tenant_access_token(force_refresh=True)
-                headers["Authorization"] = f"Bearer {self.access_token}"
-                response = requests.post(url, params=params, headers=headers, json=data)
-                result = response.json()
-        
+            if result.get("code") != TOKEN_EXPIRED_CODE:
+                break
         return result
-    
+
+    # ─── Async API (for use inside event loops) ───────────
+
+    def _get_async_session(self):
+        """Shared aiohttp session; must be created inside a running loop."""
+        if self._async_session is None or self._async_session.closed:
+            import aiohttp
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20),
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._async_session
+
+    async def get_tenant_access_token_async(self, force_refresh: bool = False) -> str:
+        """获取 tenant_access_token（异步，不阻塞事件循环）"""
+        if not force_refresh and self._is_token_valid():
+            return self.access_token
+        self._check_credentials()
+
+        if self._async_token_lock is None:
+            self._async_token_lock = asyncio.Lock()
+        stale = self.access_token
+        async with self._async_token_lock:
+            if self.access_token != stale and self._is_token_valid():
+                return self.access_token
+            async with self._get_async_session().post(TOKEN_URL, json=self._credentials()) as response:
+                result = await response.json(content_type=None)
+            return self._store_token(result)
+
+    async def send_message_async(self, receive_id: str, message: str) -> Dict:
+        """发送消息（异步，不阻塞事件循环）"""
+        data = self._message_body(receive_id, message)
+        session = self._get_async_session()
+        for attempt in range(2):
+            token = await self.get_tenant_access_token_async(force_refresh=attempt > 0)
+            async with session.post(MESSAGE_URL, params=MESSAGE_PARAMS, json=data,
+                                    headers={"Authorization": f"Bearer {token}"}) as response:
+                result = await response.json(content_type=None)
+            if result.get("code") == 0:
+                break
+            logger.error(f"Feishu send_message error: {result}")
+            # If token expired, force refresh and retry once
+            if result.get("code") != TOKEN_EXPIRED_CODE:
+                break
+        return result
+
+    async def close(self):
+        """Close pooled HTTP sessions."""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
     def handle_webhook(self, payload: Dict, headers: Dict = None) -> Optional[str]:
         """处理飞书 webhook 事件"""
         # Verify webhook token if configured
@@ -5,6 +5,8 @@ import logging
 import asyncio
 from typing import Optional, TYPE_CHECKING
 
+from ..utils import chunk_text, install_uvloop
+
 logger = logging.getLogger("xiaoclaw.Slack")
 
 try:
@@ -17,6 +19,9 @@ except ImportError:
         from slack_bolt.async_app import AsyncApp
         from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
+# Bot mention token, e.g. <@U012AB3CD>
+_MENTION_RE = re.compile(r'<@\w+>')
+
 
 class SlackAdapter:
     """Bridges Slack messages to xiaoclaw.handle_message."""
@@ -29,8 +34,17 @@ class SlackAdapter:
         self.claw = None
         # Per-user session storage
         self._sessions: dict = {}
-        # Pre-compile regex for bot mention removal
-        self._mention_pattern = re.compile(r'<@\w+>')
+
+    @property
+    def allowed_channels(self) -> Optional[list]:
+        """Channel IDs the bot answers in (None = allow all)."""
+        return self._allowed_channels_list
+
+    @allowed_channels.setter
+    def allowed_channels(self, channels: Optional[list]):
+        # Checks use the frozenset; assigning here keeps the two in step
+        self._allowed_channels_list = channels
+        self._allowed_channels = None if channels is None else frozenset(channels)
 
     def _check_channel(self, channel: str) -> bool:
         """Check if channel is allowed.
@@ -41,9 +55,9 @@ class SlackAdapter:
         Returns:
             True if channel is allowed or no restriction configured.
         """
-        if self.allowed_channels is None:
+        if self._allowed_channels is None:
             return True
-        return channel in self.allowed_channels
+        return channel in self._allowed_channels
 
     def start(self, claw):
         """Start the Slack bot via Socket Mode (blocking)."""
@@ -57,11 +71,12 @@ class SlackAdapter:
 
         @app.event("app_mention")
         async def handle_mention(event, say):
-            if not self._check_channel(event.get("channel", "")):
+            allowed = self._allowed_channels
+            if allowed is not None and event.get("channel", "") not in allowed:
                 return
             text = event.get("text", "").strip()
-            # Remove bot mention using pre-compiled regex
-            text = self._mention_pattern.sub('', text).strip()
+            # Remove bot mention
+            text = _MENTION_RE.sub('', text).strip()
             if not text:
                 return
             user_id = event.get("user", "unknown")
@@ -79,8 +94,8 @@ class SlackAdapter:
                 self.claw.session = old_session
             
             # Chunk long messages (Slack limit 3000)
-            for i in range(0, len(reply), 3000):
-                await say(reply[i:i + 3000])
+            for chunk in chunk_text(reply, 3000):
+                await say(chunk)
 
         @app.event("message")
         async def handle_dm(event, say):
@@ -110,14 +125,15 @@ class SlackAdapter:
                 self.claw.session = old_session
             
             # Chunk long messages
-            for i in range(0, len(reply), 3000):
-                await say(reply[i:i + 3000])
+            for chunk in chunk_text(reply, 3000):
+                await say(chunk)
 
         async def _run():
             handler = AsyncSocketModeHandler(app, self.app_token)
             logger.info("Slack bot starting (Socket Mode)...")
             await handler.start_async()
 
+        install_uvloop()
         asyncio.run(_run())
 
 
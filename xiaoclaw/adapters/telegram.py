@@ -3,6 +3,8 @@ import os
 import logging
 from typing import Optional, TYPE_CHECKING
 
+from ..utils import chunk_text, install_uvloop
+
 logger = logging.getLogger("xiaoclaw.Telegram")
 
 try:
@@ -24,17 +26,27 @@ class TelegramAdapter:
 
     def __init__(self, token: str = "", allowed_users: Optional[list] = None):
         self.token = token or os.getenv("TELEGRAM_BOT_TOKEN", "")
-        # Validate and normalize allowed_users to int IDs
-        if allowed_users:
-            self.allowed_users = [int(u) for u in allowed_users]
-        else:
-            self.allowed_users = None
+        self.allowed_users = allowed_users  # None/empty = allow all
         self.claw = None  # set via .start(claw)
         # Per-user session storage
         self._sessions: dict = {}
+        # (tools.version, joined tool names) for /tools
+        self._tools_cache: Optional[tuple] = None
         if not HAS_TELEGRAM:
             logger.error("python-telegram-bot not installed. pip install 'xiaoclaw[telegram]'")
 
+    @property
+    def allowed_users(self) -> Optional[list]:
+        """Telegram user IDs allowed to talk to the bot (None = allow all)."""
+        return self._allowed_users_list
+
+    @allowed_users.setter
+    def allowed_users(self, users: Optional[list]):
+        # Validate and normalize to int IDs; checks use the frozenset, and
+        # assigning here keeps the two in step
+        self._allowed_users_list = [int(u) for u in users] if users else None
+        self._allowed_users = None if self._allowed_users_list is None else frozenset(self._allowed_users_list)
+
     async def _cmd_start(self, update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         """Handle /start command.
 
@@ -65,8 +77,10 @@ class TelegramAdapter:
         """
         if not self._check_user(update) or not self.claw:
             return
-        tools = ", ".join(self.claw.tools.list_names())
-        await update.message.reply_text(f"🔧 Tools: {tools}")
+        ver = self.claw.tools.version
+        if self._tools_cache is None or self._tools_cache[0] != ver:
+            self._tools_cache = (ver, ", ".join(self.claw.tools.list_names()))
+        await update.message.reply_text(f"🔧 Tools: {self._tools_cache[1]}")
 
     async def _handle_message(self, update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         """Handle incoming text messages.
@@ -95,8 +109,8 @@ class TelegramAdapter:
             finally:
                 self.claw.session = old_session
             # Telegram has 4096 char limit per message
-            for i in range(0, len(reply), 4000):
-                await update.message.reply_text(reply[i:i + 4000])
+            for chunk in chunk_text(reply, 4000):
+                await update.message.reply_text(chunk)
         except Exception as e:
             logger.error(f"Handle error: {e}")
             await update.message.reply_text("❌ Something went wrong, please try again.")
@@ -106,10 +120,10 @@ class TelegramAdapter:
 
         Returns True if no user restriction or user is in allowed list.
         """
-        if self.allowed_users is None:
+        if self._allowed_users is None:
             return True
         uid = update.effective_user.id
-        if uid not in self.allowed_users:
+        if uid not in self._allowed_users:
             logger.warning(f"Unauthorized user: {uid}")
             return False
         return True
@@ -129,6 +143,7 @@ class TelegramAdapter:
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
 
         logger.info("Telegram bot starting...")
+        install_uvloop()
         app.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
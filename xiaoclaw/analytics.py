@@ -1,19 +1,89 @@
 """xiaoclaw Analytics — Token usage tracking and statistics"""
+import atexit
 import json
 import logging
+import os
+import queue
+import sqlite3
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+from dataclasses import dataclass, asdict, fields, is_dataclass
+from collections import defaultdict, deque
 import threading
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger("xiaoclaw.Analytics")
 
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes; orjson encodes dataclasses natively."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(asdict(obj) if is_dataclass(obj) else obj).encode("utf-8")
+
+
+def _json_line(obj: Any) -> bytes:
+    """One JSONL line; orjson appends the newline without an extra copy."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+# Max buffers per writev() call (POSIX guarantees at least 16, Linux has 1024)
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 16
+
+
+def _append_lines(path: Path, lines: List[bytes]) -> None:
+    """Append pre-encoded lines with one scatter-gather write where possible."""
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        written = 0
+        if hasattr(os, "writev") and len(lines) <= _IOV_MAX:
+            written = os.writev(fd, lines)
+        total = sum(map(len, lines))
+        if written < total:
+            # No writev, too many buffers, or a short write: finish with plain writes
+            data = b"".join(lines)
+            while written < total:
+                written += os.write(fd, data[written:])
+    finally:
+        os.close(fd)
+
 STATS_DIR = Path.home() / ".xiaoclaw" / "stats"
 
+FLUSH_BATCH = 10  # write after this many queued records...
+FLUSH_INTERVAL = 2.0  # ...or after this many idle seconds
+
+_FLUSH = object()  # queue markers for the background writer
+_STOP = object()
+
+# Every call is also indexed in one SQLite table so range reports are a few
+# GROUP BY queries instead of one file read + Python merge per day
+_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    ts REAL, date TEXT, model TEXT, provider TEXT,
+    input_tokens INTEGER, output_tokens INTEGER, duration_ms REAL,
+    success INTEGER, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calls_date ON calls(date);
+CREATE INDEX IF NOT EXISTS idx_calls_ts ON calls(ts);
+"""
 
-@dataclass
+
+@dataclass(slots=True)
 class CallRecord:
     """Single API call record."""
     timestamp: float
@@ -26,6 +96,13 @@ class CallRecord:
     success: bool
     error: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        # Flat fields only, so skip asdict()'s recursive deepcopy
+        return {name: getattr(self, name) for name in _CALL_RECORD_FIELDS}
+
+
+_CALL_RECORD_FIELDS = tuple(f.name for f in fields(CallRecord))
+
 
 @dataclass 
 class DailyStats:
@@ -41,6 +118,47 @@ class DailyStats:
     models: Dict[str, Dict[str, int]]  # {model_name: {calls, tokens}}
     providers: Dict[str, Dict[str, int]]  # {provider_name: {calls, tokens}}
     errors: List[Dict[str, Any]]  # List of {time, model, error}
+    duration_count: int = 0  # calls with duration_ms > 0, for merging averages
+    duration_sum_ms: float = 0.0  # exact running total behind avg_duration_ms
+
+
+def _merge_daily(a: DailyStats, b: DailyStats) -> DailyStats:
+    """Combine two summaries of the same day."""
+    # Keep an exact running sum rather than re-averaging rounded averages,
+    # which would drift a little with every flush. Summaries written before
+    # these fields existed fall back to avg × call count.
+    a_dur = a.duration_count or (a.total_calls if a.avg_duration_ms > 0 else 0)
+    b_dur = b.duration_count or (b.total_calls if b.avg_duration_ms > 0 else 0)
+    dur_count = a_dur + b_dur
+    dur_sum = (a.duration_sum_ms or a.avg_duration_ms * a_dur) + (b.duration_sum_ms or b.avg_duration_ms * b_dur)
+    avg = dur_sum / dur_count if dur_count else 0
+
+    models = {m: dict(v) for m, v in a.models.items()}
+    for m, v in b.models.items():
+        mv = models.setdefault(m, {'calls': 0, 'tokens': 0, 'input': 0, 'output': 0})
+        for k, n in v.items():
+            mv[k] = mv.get(k, 0) + n
+    providers = {p: dict(v) for p, v in a.providers.items()}
+    for p, v in b.providers.items():
+        pv = providers.setdefault(p, {'calls': 0, 'tokens': 0})
+        for k, n in v.items():
+            pv[k] = pv.get(k, 0) + n
+
+    return DailyStats(
+        date=a.date,
+        total_calls=a.total_calls + b.total_calls,
+        success_calls=a.success_calls + b.success_calls,
+        failed_calls=a.failed_calls + b.failed_calls,
+        total_input_tokens=a.total_input_tokens + b.total_input_tokens,
+        total_output_tokens=a.total_output_tokens + b.total_output_tokens,
+        total_tokens=a.total_tokens + b.total_tokens,
+        avg_duration_ms=round(avg, 2),
+        models=models,
+        providers=providers,
+        errors=(a.errors + b.errors)[-20:],
+        duration_count=dur_count,
+        duration_sum_ms=dur_sum,
+    )
 
 
 class Analytics:
@@ -50,143 +168,344 @@ class Analytics:
         self.stats_dir = stats_dir or STATS_DIR
         self.stats_dir.mkdir(parents=True, exist_ok=True)
         self._lock = threading.Lock()
-        self._current_records: List[CallRecord] = []
-        self._current_date = datetime.now().strftime("%Y-%m-%d")
+        # date → (summary file mtime_ns, DailyStats)
+        self._summary_cache: Dict[str, tuple] = {}
+        # record() only enqueues; a background thread batches and writes to disk
+        # (day start ts, next day start ts, "YYYY-MM-DD") for the current local day
+        self._day: tuple = (0.0, 0.0, "")
+        self._flush_q: "queue.Queue" = queue.Queue()
+        self._db: Optional[sqlite3.Connection] = None  # writer connection, used under _lock
+        # Writer thread starts with the first record(); instances that never
+        # record (most tests, read-only reports) don't own a thread at all
+        self._writer: Optional[threading.Thread] = None
+        self._state_lock = threading.Lock()  # guards _writer/_closed against close()
+        self._closed = False
         
     def _get_daily_file(self, date: str) -> Path:
-        """Get stats file path for a date."""
+        """Legacy single-file stats path (records + summary) for a date."""
         return self.stats_dir / f"stats_{date}.json"
+
+    def _get_summary_file(self, date: str) -> Path:
+        return self.stats_dir / f"summary_{date}.json"
+
+    def _get_records_file(self, date: str) -> Path:
+        return self.stats_dir / f"records_{date}.jsonl"
+
+    def _get_db_file(self) -> Path:
+        return self.stats_dir / "analytics.sqlite"
+
+    def _get_db(self) -> sqlite3.Connection:
+        """Writer-side connection, created on first use."""
+        if self._db is None:
+            self._db = sqlite3.connect(self._get_db_file(), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_DB_SCHEMA)
+        return self._db
     
+    def _date_for(self, ts: float) -> str:
+        """Local date string for a timestamp; a float range check on the same day."""
+        start, end, date = self._day
+        if start <= ts < end:
+            return date
+        day = datetime.fromtimestamp(ts).date()
+        midnight = datetime.min.time()
+        # Assigned as one tuple so concurrent record() calls never see a mixed state
+        self._day = (
+            datetime.combine(day, midnight).timestamp(),
+            datetime.combine(day + timedelta(days=1), midnight).timestamp(),
+            day.isoformat(),
+        )
+        return self._day[2]
+
     def record(self, model: str, provider: str, input_tokens: int, output_tokens: int,
                duration_ms: float, success: bool, error: Optional[str] = None) -> None:
         """Record an API call."""
-        now = datetime.now()
-        today = now.strftime("%Y-%m-%d")
-        
+        now = time.time()
+        record = CallRecord(
+            timestamp=now,
+            model=model,
+            provider=provider,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            duration_ms=duration_ms,
+            success=success,
+            error=error
+        )
+        date = self._date_for(now)
+        with self._state_lock:
+            if not self._closed:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._writer_loop, name="xiaoclaw-analytics", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.close)
+                self._flush_q.put_nowait((date, record))
+                return
+        # Closed: no writer any more, so write this one record directly
         with self._lock:
-            # 如果日期变了，先保存之前的数据
-            if today != self._current_date and self._current_records:
-                self._save_daily_records(self._current_date, self._current_records)
-                self._current_records = []
-                self._current_date = today
-            
-            record = CallRecord(
-                timestamp=now.timestamp(),
-                model=model,
-                provider=provider,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                total_tokens=input_tokens + output_tokens,
-                duration_ms=duration_ms,
-                success=success,
-                error=error
-            )
-            
-            self._current_records.append(record)
-            
-            # 每 10 条自动保存一次
-            if len(self._current_records) >= 10:
-                self._save_daily_records(today, self._current_records)
-                self._current_records = []
+            try:
+                self._save_daily_records(date, [record])
+            finally:
+                self._close_db()
     
     def flush(self) -> None:
-        """Explicitly flush current records to disk."""
-        with self._lock:
-            if self._current_records:
-                self._save_daily_records(self._current_date, self._current_records)
-                self._current_records = []
+        """Explicitly flush current records to disk (blocks until written)."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._flush_q.put(_FLUSH)
+            self._flush_q.join()
+
+    def close(self) -> None:
+        """Write pending records and stop the background writer.
+
+        Later record() calls still work; they are written synchronously.
+        """
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+            if writer is not None:
+                self._flush_q.put(_STOP)
+                atexit.unregister(self.close)
+        if writer is not None:
+            writer.join(timeout=5)
+        else:
+            with self._lock:
+                self._close_db()
+
+    def _close_db(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _writer_loop(self) -> None:
+        """Batch queued records per date; write every FLUSH_BATCH records,
+        after FLUSH_INTERVAL seconds idle, or when flush()/close() asks."""
+        pending: Dict[str, List[CallRecord]] = {}
+        queued = 0  # items taken from the queue but not yet task_done()
+        while True:
+            try:
+                item = self._flush_q.get(timeout=FLUSH_INTERVAL if queued else None)
+            except queue.Empty:
+                item = _FLUSH
+            else:
+                queued += 1
+
+            if item is not _FLUSH and item is not _STOP:
+                date, record = item
+                pending.setdefault(date, []).append(record)
+                if queued < FLUSH_BATCH:
+                    continue
+
+            # 按日期分批保存
+            for date, records in pending.items():
+                try:
+                    with self._lock:
+                        self._save_daily_records(date, records)
+                except Exception as e:  # keep the writer alive; flush() waits on it
+                    logger.error(f"Could not save stats for {date}: {e}")
+            pending = {}
+            for _ in range(queued):
+                self._flush_q.task_done()
+            queued = 0
+            if item is _STOP:
+                with self._lock:
+                    self._close_db()
+                return
     
     def _save_daily_records(self, date: str, records: List[CallRecord]) -> None:
-        """Save records to daily file."""
+        """Append records to the day's log and fold them into its summary."""
         if not records:
             return
-            
-        file_path = self._get_daily_file(date)
-        
-        # 读取现有数据 - catch specific exceptions
-        existing = []
-        if file_path.exists():
+
+        rows = [r.to_dict() for r in records]
+        _append_lines(self._get_records_file(date), [_json_line(r) for r in rows])
+        self._index_records(date, records)
+
+        # 计算聚合统计 — only the new batch, merged into the stored summary
+        daily = self._aggregate_records(rows, date)
+        existing = self._load_summary(date)
+        if existing:
+            daily = _merge_daily(existing, daily)
+
+        # Write-then-rename so readers never see a half-written summary
+        summary_file = self._get_summary_file(date)
+        tmp = summary_file.with_suffix(".tmp")
+        with open(tmp, 'wb') as f:
+            f.write(_json_dumps(daily))
+        os.replace(tmp, summary_file)
+        self._summary_cache[date] = (summary_file.stat().st_mtime_ns, daily)
+
+    def _index_records(self, date: str, records: List[CallRecord]) -> None:
+        """Insert a batch into the SQLite call index (one transaction)."""
+        try:
+            db = self._get_db()
+            with db:
+                db.executemany(
+                    "INSERT INTO calls VALUES (?,?,?,?,?,?,?,?,?)",
+                    [(r.timestamp, date, r.model, r.provider, r.input_tokens, r.output_tokens,
+                      r.duration_ms, int(r.success), r.error) for r in records],
+                )
+        except sqlite3.Error as e:
+            # The .jsonl log and summary stay authoritative: get_range_stats() only
+            # uses a day's index rows when their count matches the summary
+            logger.warning(f"Could not index stats for {date}: {e}")
+
+    def _query_range(self, start_date: str, end_date: str) -> Dict[str, DailyStats]:
+        """Per-day summaries for [start_date, end_date] from the SQLite index.
+
+        A day can be partly indexed (failed insert, index created or rebuilt
+        mid-history), so callers check the counts against the summary files.
+        """
+        db_file = self._get_db_file()
+        if not db_file.exists():
+            return {}
+        where = "WHERE date BETWEEN ? AND ?"
+        try:
+            db = sqlite3.connect(db_file)
             try:
-                with open(file_path, 'r') as f:
-                    existing = json.load(f).get('records', [])
-            except (json.JSONDecodeError, OSError) as e:
-                logger.warning(f"Could not read existing stats file for {date}: {e}. Starting fresh.")
-                existing = []
-        
-        # 合并
-        all_records = existing + [asdict(r) for r in records]
-        
-        # 计算聚合统计
-        daily = self._aggregate_records(all_records, date)
-        
-        with open(file_path, 'w') as f:
-            json.dump({
-                'date': date,
-                'records': all_records,
-                'summary': asdict(daily)
-            }, f)
+                days = db.execute(
+                    "SELECT date, COUNT(*), SUM(success), SUM(input_tokens), SUM(output_tokens),"
+                    " SUM(CASE WHEN duration_ms > 0 THEN duration_ms ELSE 0 END),"
+                    " SUM(duration_ms > 0)"
+                    f" FROM calls {where} GROUP BY date", (start_date, end_date)).fetchall()
+                by_model = db.execute(
+                    "SELECT date, model, COUNT(*), SUM(input_tokens), SUM(output_tokens)"
+                    f" FROM calls {where} GROUP BY date, model", (start_date, end_date)).fetchall()
+                by_provider = db.execute(
+                    "SELECT date, provider, COUNT(*), SUM(input_tokens + output_tokens)"
+                    f" FROM calls {where} GROUP BY date, provider", (start_date, end_date)).fetchall()
+            finally:
+                db.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not query stats index: {e}")
+            return {}
+
+        result: Dict[str, DailyStats] = {}
+        for date, calls, success, inp, out, dur_sum, dur_count in days:
+            result[date] = DailyStats(
+                date=date,
+                total_calls=calls,
+                success_calls=success,
+                failed_calls=calls - success,
+                total_input_tokens=inp,
+                total_output_tokens=out,
+                total_tokens=inp + out,
+                avg_duration_ms=round(dur_sum / dur_count, 2) if dur_count else 0,
+                models={},
+                providers={},
+                errors=[],
+                duration_count=dur_count,
+                duration_sum_ms=dur_sum,
+            )
+        for date, model, calls, inp, out in by_model:
+            result[date].models[model] = {'calls': calls, 'tokens': inp + out, 'input': inp, 'output': out}
+        for date, provider, calls, tokens in by_provider:
+            result[date].providers[provider] = {'calls': calls, 'tokens': tokens}
+        return result
+
+    def _load_summary(self, date: str) -> Optional[DailyStats]:
+        """Read a day's summary, served from cache while the file is unchanged."""
+        summary_file = self._get_summary_file(date)
+        try:
+            mtime = summary_file.stat().st_mtime_ns
+        except OSError:
+            return self._load_legacy_summary(date)
+
+        cached = self._summary_cache.get(date)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(summary_file, 'rb') as f:
+                daily = DailyStats(**_json_loads(f.read()))
+        except (json.JSONDecodeError, TypeError, OSError) as e:
+            logger.warning(f"Could not read stats summary for {date}: {e}")
+            return None
+        self._summary_cache[date] = (mtime, daily)
+        return daily
+
+    def _load_legacy_summary(self, date: str) -> Optional[DailyStats]:
+        """Summary block of a pre-split stats_<date>.json file, if any."""
+        file_path = self._get_daily_file(date)
+        if not file_path.exists():
+            return None
+        try:
+            with open(file_path, 'rb') as f:
+                return DailyStats(**_json_loads(f.read()).get('summary', {}))
+        except (json.JSONDecodeError, TypeError, OSError) as e:
+            logger.warning(f"Could not read stats file for {date}: {e}")
+            return None
     
     def _aggregate_records(self, records: List[Dict], date: str) -> DailyStats:
-        """Aggregate records into daily stats."""
-        total_calls = len(records)
-        success_calls = sum(1 for r in records if r['success'])
-        failed_calls = total_calls - success_calls
-        total_input = sum(r['input_tokens'] for r in records)
-        total_output = sum(r['output_tokens'] for r in records)
-        durations = [r['duration_ms'] for r in records if r['duration_ms'] > 0]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        
-        # 按模型统计
-        models = defaultdict(lambda: {'calls': 0, 'tokens': 0, 'input': 0, 'output': 0})
-        for r in records:
-            models[r['model']]['calls'] += 1
-            models[r['model']]['tokens'] += r['total_tokens']
-            models[r['model']]['input'] += r['input_tokens']
-            models[r['model']]['output'] += r['output_tokens']
-        
-        # 按提供商统计
-        providers = defaultdict(lambda: {'calls': 0, 'tokens': 0})
+        """Aggregate records into daily stats in a single pass."""
+        success_calls = 0
+        total_input = 0
+        total_output = 0
+        duration_sum = 0.0
+        duration_count = 0
+        models: Dict[str, Dict[str, int]] = {}
+        providers: Dict[str, Dict[str, int]] = {}
+        errors: deque = deque(maxlen=20)  # 错误记录（只保留最近 20 条）
+
         for r in records:
-            providers[r['provider']]['calls'] += 1
-            providers[r['provider']]['tokens'] += r['total_tokens']
-        
-        # 错误记录（只保留最近 20 条）
-        errors = [
-            {'time': r['timestamp'], 'model': r['model'], 'error': r['error']}
-            for r in records if not r['success'] and r['error']
-        ][-20:]
+            inp = r['input_tokens']
+            out = r['output_tokens']
+            tok = r['total_tokens']
+            total_input += inp
+            total_output += out
+            d = r['duration_ms']
+            if d > 0:
+                duration_sum += d
+                duration_count += 1
+
+            # 按模型统计
+            mv = models.get(r['model'])
+            if mv is None:
+                mv = models[r['model']] = {'calls': 0, 'tokens': 0, 'input': 0, 'output': 0}
+            mv['calls'] += 1
+            mv['tokens'] += tok
+            mv['input'] += inp
+            mv['output'] += out
+
+            # 按提供商统计
+            pv = providers.get(r['provider'])
+            if pv is None:
+                pv = providers[r['provider']] = {'calls': 0, 'tokens': 0}
+            pv['calls'] += 1
+            pv['tokens'] += tok
+
+            if r['success']:
+                success_calls += 1
+            elif r['error']:
+                errors.append({'time': r['timestamp'], 'model': r['model'], 'error': r['error']})
+
+        total_calls = len(records)
+        avg_duration = duration_sum / duration_count if duration_count else 0
         
         return DailyStats(
             date=date,
             total_calls=total_calls,
             success_calls=success_calls,
-            failed_calls=failed_calls,
+            failed_calls=total_calls - success_calls,
             total_input_tokens=total_input,
             total_output_tokens=total_output,
             total_tokens=total_input + total_output,
             avg_duration_ms=round(avg_duration, 2),
-            models=dict(models),
-            providers=dict(providers),
-            errors=errors
+            models=models,
+            providers=providers,
+            errors=list(errors),
+            duration_count=duration_count,
+            duration_sum_ms=duration_sum,
         )
     
     def get_daily_stats(self, date: Optional[str] = None) -> Optional[DailyStats]:
         """Get stats for a specific date (read-only, no side effects)."""
-        date = date or datetime.now().strftime("%Y-%m-%d")
-        file_path = self._get_daily_file(date)
-        
-        # Don't flush records as a side effect - just read from file
-        if not file_path.exists():
-            return None
-        
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                summary = data.get('summary', {})
-                return DailyStats(**summary)
-        except (json.JSONDecodeError, KeyError, OSError) as e:
-            logger.warning(f"Could not read stats file for {date}: {e}")
-            return None
+        date = date or self._date_for(time.time())
+        # Don't flush records as a side effect - just read the stored summary
+        return self._load_summary(date)
     
     def get_range_stats(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get aggregated stats for a date range."""
@@ -204,11 +523,17 @@ class Analytics:
         all_models = defaultdict(lambda: {'calls': 0, 'tokens': 0, 'input': 0, 'output': 0})
         all_providers = defaultdict(lambda: {'calls': 0, 'tokens': 0})
         daily_data = []
+        indexed = self._query_range(start_date, end_date)
         
         current = start
         while current <= end:
             date_str = current.strftime("%Y-%m-%d")
             daily = self.get_daily_stats(date_str)
+            # The index has the exact per-model/provider split, but only counts
+            # when it holds every call of the day the summary knows about
+            rows = indexed.get(date_str)
+            if rows and (daily is None or rows.total_calls == daily.total_calls):
+                daily = rows
             if daily:
                 total_calls += daily.total_calls
                 total_success += daily.success_calls
@@ -254,8 +579,9 @@ class Analytics:
                 'avg_duration_ms': avg_duration
             },
             'success_rate': success_rate,
-            'by_model': dict(all_models),
-            'by_provider': dict(all_providers),
+            # Ordered by token usage (descending) so reports can iterate directly
+            'by_model': dict(sorted(all_models.items(), key=lambda x: -x[1]['tokens'])),
+            'by_provider': dict(sorted(all_providers.items(), key=lambda x: -x[1]['tokens'])),
             'daily': daily_data
         }
     
@@ -289,14 +615,14 @@ class Analytics:
         
         if stats['by_model']:
             lines.append(f"\n🤖 {'By Model:' if LANG != 'zh' else '按模型:'}")
-            for model, data in sorted(stats['by_model'].items(), key=lambda x: -x[1]['tokens']):
+            for model, data in stats['by_model'].items():
                 lines.append(f"  {model}:")
                 lines.append(f"    Calls: {data['calls']:,} | Tokens: {data['tokens']:,}")
                 lines.append(f"    Input: {data['input']:,} | Output: {data['output']:,}")
         
         if stats['by_provider']:
             lines.append(f"\n🔌 {'By Provider:' if LANG != 'zh' else '按提供商:'}")
-            for provider, data in sorted(stats['by_provider'].items(), key=lambda x: -x[1]['tokens']):
+            for provider, data in stats['by_provider'].items():
                 lines.append(f"  {provider}: {data['calls']:,} calls, {data['tokens']:,} tokens")
         
         if stats['daily']:
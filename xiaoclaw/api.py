@@ -1,18 +1,49 @@
 """xiaoclaw API Server — lightweight FastAPI-based HTTP interface"""
 import os
+import json
 import logging
 
 logger = logging.getLogger("xiaoclaw.API")
 
 try:
-    from fastapi import FastAPI, HTTPException, Depends, Security
+    from fastapi import FastAPI, HTTPException, Depends, Security, Header
     from fastapi.security import APIKeyHeader
-    from fastapi.responses import StreamingResponse
+    from fastapi.responses import StreamingResponse, JSONResponse
     from pydantic import BaseModel
     HAS_FASTAPI = True
 except ImportError:
     HAS_FASTAPI = False
 
+try:
+    import orjson  # ORJSONResponse also needs it at render time
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Streaming /chat defaults to raw text/plain chunks. Clients sending
+# "Accept: text/event-stream" get Server-Sent Events instead: one JSON-encoded
+# text chunk per event (JSON keeps newlines inside a chunk from breaking the
+# event framing), then a final "done" event.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+_SSE_DONE = b"event: done\ndata: [DONE]\n\n"
+
+
+def _sse_event(chunk: str) -> bytes:
+    data = orjson.dumps(chunk) if HAS_ORJSON else json.dumps(chunk).encode("utf-8")
+    return b"data: " + data + b"\n\n"
+
+
+async def _stream_body(chunks, sse: bool = False):
+    """Body of a streaming /chat response."""
+    if not sse:
+        async for chunk in chunks:
+            yield chunk
+        return
+    # Yield bytes so Starlette doesn't re-encode every chunk
+    async for chunk in chunks:
+        yield _sse_event(chunk)
+    yield _SSE_DONE
+
 # API Key authentication
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False) if HAS_FASTAPI else None
 
@@ -40,7 +71,11 @@ def create_app(claw=None):
     if claw is None:
         claw = XiaClaw(XiaClawConfig.from_env())
 
-    app = FastAPI(title="xiaoclaw", version=VERSION)
+    if HAS_ORJSON:
+        from fastapi.responses import ORJSONResponse as DefaultResponse
+    else:
+        DefaultResponse = JSONResponse
+    app = FastAPI(title="xiaoclaw", version=VERSION, default_response_class=DefaultResponse)
 
     class ChatRequest(BaseModel):
         message: str
@@ -56,23 +91,33 @@ def create_app(claw=None):
         """Health check endpoint - no auth required for monitoring."""
         return claw.health_check()
 
+    # Constant / rarely-changing bodies are serialized once and the response reused
+    version_resp = DefaultResponse({"version": VERSION})
+    tools_cache: list = [None, None]  # [tools.version, response]
+
     @app.get("/version")
     async def version(api_key: str = Depends(get_api_key)):
-        return {"version": VERSION}
+        return version_resp
 
-    @app.post("/chat", response_model=ChatResponse)
-    async def chat(req: ChatRequest, api_key: str = Depends(get_api_key)):
+    # ChatResponse only documents the schema; the reply is not re-validated
+    @app.post("/chat", responses={200: {"model": ChatResponse}})
+    async def chat(req: ChatRequest, api_key: str = Depends(get_api_key),
+                   accept: str = Header("")):
         if req.stream:
-            async def gen():
-                async for chunk in claw.handle_message_stream(req.message, user_id=req.user_id):
-                    yield chunk
-            return StreamingResponse(gen(), media_type="text/plain")
+            chunks = claw.handle_message_stream(req.message, user_id=req.user_id)
+            if "text/event-stream" in accept:
+                return StreamingResponse(_stream_body(chunks, sse=True),
+                                         media_type="text/event-stream", headers=_SSE_HEADERS)
+            return StreamingResponse(_stream_body(chunks), media_type="text/plain")
         reply = await claw.handle_message(req.message, user_id=req.user_id)
-        return ChatResponse(response=reply, session_id=claw.session.session_id)
+        return DefaultResponse({"response": reply, "session_id": claw.session.session_id})
 
     @app.get("/tools")
     async def tools(api_key: str = Depends(get_api_key)):
-        return {"tools": claw.tools.list_names()}
+        ver = claw.tools.version
+        if tools_cache[1] is None or tools_cache[0] != ver:
+            tools_cache[:] = [ver, DefaultResponse({"tools": claw.tools.list_names()})]
+        return tools_cache[1]
 
     @app.get("/stats")
     async def stats(api_key: str = Depends(get_api_key)):
@@ -96,8 +141,12 @@ def create_app(claw=None):
     return app
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000):
-    """Run the API server."""
+def run_server(host: str = "0.0.0.0", port: int = 8000, workers: int = 1):
+    """Run the API server.
+
+    With workers > 1 each worker process builds its own XiaClaw via the
+    create_app factory, so sessions and stats are per-worker.
+    """
     if not HAS_FASTAPI:
         print("Error: FastAPI not installed. pip install fastapi uvicorn")
         return
@@ -106,5 +155,12 @@ def run_server(host: str = "0.0.0.0", port: int = 8000):
     except ImportError:
         print("Error: uvicorn not installed. pip install uvicorn")
         return
-    app = create_app()
-    uvicorn.run(app, host=host, port=port)
+    # loop/http "auto" pick uvloop + httptools when installed (uvicorn[standard]),
+    # and fall back to asyncio + h11 (e.g. uvloop on Windows)
+    opts = dict(host=host, port=port, loop="auto", http="auto",
+                log_level="warning", access_log=False)
+    if workers > 1:
+        # Multiple processes need an import string, not an app object
+        uvicorn.run("xiaoclaw.api:create_app", factory=True, workers=workers, **opts)
+    else:
+        uvicorn.run(create_app(), **opts)
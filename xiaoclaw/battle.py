@@ -4,16 +4,21 @@
 最后由"主持人"汇总所有观点给出结论。
 """
 import asyncio
-import re
+import functools
+import hashlib
+import itertools
 import json
 import logging
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable
 
-logger = logging.getLogger("xiaoclaw.Battle")
+from .utils import run_coro_sync, strip_think
 
-# Pre-compiled regex for stripping <think> tags (used in hot path)
-_THINK_RE = re.compile(r'<think>.*?</think>\s*', re.DOTALL)
+logger = logging.getLogger("xiaoclaw.Battle")
 
 
 # ─── Role 定义 ────────────────────────────────────────
@@ -24,16 +29,19 @@ class Role:
     system_prompt: str
     emoji: str = "💬"
     max_tokens: int = 300
+    # System message is the same for every question; built once in __post_init__
+    _system_message: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._system_message = {"role": "system", "content": (
+            f"{self.system_prompt}\n\n"
+            f"请针对以下问题，从你的专业角度给出简洁观点（不超过200字，用中文回答）。"
+            f"直接给出观点，不要重复问题，不要说'作为XX'这种开头。"
+        )}
 
     def build_messages(self, question: str) -> list:
-        return [
-            {"role": "system", "content": (
-                f"{self.system_prompt}\n\n"
-                f"请针对以下问题，从你的专业角度给出简洁观点（不超过200字，用中文回答）。"
-                f"直接给出观点，不要重复问题，不要说'作为XX'这种开头。"
-            )},
-            {"role": "user", "content": question},
-        ]
+        # The system dict is shared read-only across calls
+        return [self._system_message, {"role": "user", "content": question}]
 
 
 # ─── 预设角色 ─────────────────────────────────────────
@@ -77,6 +85,97 @@ MODERATOR_PROMPT = (
     "3. 不超过300字，用中文回答\n"
     "4. 直接给结论，不要说'综合各方观点'这种废话开头"
 )
+_MODERATOR_SYSTEM = {"role": "system", "content": MODERATOR_PROMPT}
+
+
+# ─── Response Cache ───────────────────────────────────
+
+class ResponseCache:
+    """角色回答缓存：相同（或仅空白/大小写不同）的问题直接复用上次结果。
+
+    Bounded LRU with a TTL so repeated battles on the same question skip the
+    LLM round-trip but answers don't live forever. Opt-in: pass one to
+    BattleEngine(cache=...); by default every battle asks the roles afresh.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[bytes, tuple]" = OrderedDict()  # key → (expires_at, value)
+
+    @staticmethod
+    def key(*parts: str) -> bytes:
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace and case so trivially different questions share a key."""
+        return " ".join(text.split()).casefold()
+
+    def get(self, key: bytes) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: bytes, value: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class PromptCache:
+    """磁盘上的精确匹配 LLM 回答缓存，跨进程复用（默认关闭）。
+
+    Keyed on the exact (model, messages, max_tokens) request; entries expire
+    by file mtime. Enable with XIAOCLAW_LLM_CACHE=1 (~/.cache/xiaoclaw/llm)
+    or XIAOCLAW_LLM_CACHE=<dir>.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: float = 7 * 86400):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+
+    @classmethod
+    def from_env(cls) -> Optional["PromptCache"]:
+        val = os.getenv("XIAOCLAW_LLM_CACHE", "").strip()
+        if not val or val.lower() in ("0", "false", "no"):
+            return None
+        if val.lower() in ("1", "true", "yes"):
+            return cls(Path.home() / ".cache" / "xiaoclaw" / "llm")
+        return cls(Path(val).expanduser())
+
+    @staticmethod
+    def key(model: str, messages: list, max_tokens: int) -> str:
+        raw = json.dumps([model, messages, max_tokens], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))["content"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"content": content}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug(f"Prompt cache write failed: {e}")
 
 
 # ─── Battle Engine ────────────────────────────────────
@@ -84,24 +183,52 @@ MODERATOR_PROMPT = (
 class BattleEngine:
     """多角色辩论引擎，并发调用LLM获取各角色观点后汇总。"""
 
-    def __init__(self, provider):
+    def __init__(self, provider, concurrency_limit: int = 4, cache: Optional[ResponseCache] = None,
+                 prompt_cache: Optional[PromptCache] = None):
         """
         Args:
             provider: Provider instance with .client and .current_model
+            concurrency_limit: 同时进行的角色调用上限（避免触发 provider 限流）
+            cache: 角色回答缓存（ResponseCache），默认关闭：重复提问会重新辩论
+            prompt_cache: 磁盘请求缓存，默认由 XIAOCLAW_LLM_CACHE 决定（未设置则关闭）
         """
         self.provider = provider
+        self.concurrency_limit = max(1, concurrency_limit)
+        self.cache = cache
+        self.prompt_cache = prompt_cache if prompt_cache is not None else PromptCache.from_env()
+
+    async def _complete(self, model: str, messages: list, max_tokens: int) -> str:
+        """One chat completion with <think> stripped, served from the prompt cache when enabled."""
+        key = PromptCache.key(model, messages, max_tokens) if self.prompt_cache else None
+        if key:
+            cached = self.prompt_cache.get(key)
+            if cached is not None:
+                return cached
+        resp = await self.provider.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+        )
+        content = resp.choices[0].message.content or ""
+        content = strip_think(content)
+        if key:
+            self.prompt_cache.put(key, content)
+        return content
 
     async def _call_role(self, role: Role, question: str) -> Dict[str, str]:
         """调用单个角色获取观点。"""
-        messages = role.build_messages(question)
+        model = self.provider.current_model
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(model, role.name, role.system_prompt, ResponseCache.normalize(question))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {"name": role.name, "emoji": role.emoji, "content": cached}
+
         try:
-            resp = await self.provider.client.chat.completions.create(
-                model=self.provider.current_model,
-                messages=messages,
-                max_tokens=role.max_tokens,
-            )
-            content = resp.choices[0].message.content or ""
-            content = _THINK_RE.sub('', content).strip()
+            content = await self._complete(model, role.build_messages(question), role.max_tokens)
+            if key is not None:
+                self.cache.put(key, content)  # failures below are never cached
             return {"name": role.name, "emoji": role.emoji, "content": content}
         except Exception as e:
             logger.error(f"Role '{role.name}' failed: {e}")
@@ -113,7 +240,7 @@ class BattleEngine:
             f"【{o['name']}】: {o['content']}" for o in opinions
         )
         messages = [
-            {"role": "system", "content": MODERATOR_PROMPT},
+            _MODERATOR_SYSTEM,
             {"role": "user", "content": (
                 f"讨论主题: {question}\n\n"
                 f"各方观点:\n{opinion_text}\n\n"
@@ -121,14 +248,7 @@ class BattleEngine:
             )},
         ]
         try:
-            resp = await self.provider.client.chat.completions.create(
-                model=self.provider.current_model,
-                messages=messages,
-                max_tokens=500,
-            )
-            content = resp.choices[0].message.content or ""
-            content = _THINK_RE.sub('', content).strip()
-            return content
+            return await self._complete(self.provider.current_model, messages, 500)
         except Exception as e:
             logger.error(f"Moderator failed: {e}")
             return f"[主持人汇总失败: {e}]"
@@ -138,6 +258,7 @@ class BattleEngine:
         question: str,
         role_keys: Optional[List[str]] = None,
         custom_roles: Optional[List[Dict[str, str]]] = None,
+        on_opinion: Optional[Callable[[Dict[str, str]], Any]] = None,
     ) -> Dict[str, Any]:
         """
         执行多角色辩论。
@@ -146,6 +267,7 @@ class BattleEngine:
             question: 辩论主题
             role_keys: 预设角色key列表，如 ["ceo","cto","dev"]
             custom_roles: 自定义角色列表，如 [{"name":"投资人","prompt":"从投资角度分析"}]
+            on_opinion: 每个角色观点完成时回调（按完成顺序），可用于渐进式输出
 
         Returns:
             {"question": str, "opinions": [...], "conclusion": str, "formatted": str}
@@ -173,9 +295,20 @@ class BattleEngine:
         if not roles:
             roles = [PRESET_ROLES[k] for k in DEFAULT_BATTLE_ROLES]
 
-        # 并发调用所有角色
-        tasks = [self._call_role(role, question) for role in roles]
-        opinions = await asyncio.gather(*tasks)
+        # 并发调用所有角色（最多 concurrency_limit 个同时进行）
+        # The semaphore is per battle so the engine can be used from any loop
+        sem = asyncio.Semaphore(self.concurrency_limit)
+
+        async def call(i: int, role: Role):
+            async with sem:
+                return i, await self._call_role(role, question)
+
+        opinions: List[Dict[str, str]] = [None] * len(roles)
+        for next_done in asyncio.as_completed([call(i, role) for i, role in enumerate(roles)]):
+            i, opinion = await next_done
+            opinions[i] = opinion  # keep role order for the moderator / output
+            if on_opinion:
+                on_opinion(opinion)
 
         # 主持人汇总
         conclusion = await self._call_moderator(question, opinions)
@@ -193,25 +326,25 @@ class BattleEngine:
 
 # ─── 格式化输出 ───────────────────────────────────────
 
+_SEP = "─" * 40
+_OPINION_FMT = "\n{emoji} {name}:\n  {content}"
+
 def format_battle_output(
     question: str,
     opinions: List[Dict[str, str]],
     conclusion: str,
 ) -> str:
     """格式化battle结果为好看的文本。"""
-    lines = [f"\n🏢 Battle: \"{question}\"\n"]
-    lines.append("─" * 40)
-    for o in opinions:
-        lines.append(f"\n{o['emoji']} {o['name']}:")
-        lines.append(f"  {o['content']}")
-    lines.append("\n" + "─" * 40)
-    lines.append(f"\n📋 结论:\n  {conclusion}")
-    lines.append("")
-    return "\n".join(lines)
+    return "\n".join(itertools.chain(
+        (f"\n🏢 Battle: \"{question}\"\n", _SEP),
+        (_OPINION_FMT.format_map(o) for o in opinions),
+        ("\n" + _SEP, f"\n📋 结论:\n  {conclusion}", ""),
+    ))
 
 
+@functools.lru_cache(maxsize=1)
 def list_preset_roles() -> str:
-    """列出所有预设角色。"""
+    """列出所有预设角色。（PRESET_ROLES 不会在运行时变化，结果只构建一次）"""
     lines = ["🏢 预设角色列表:\n"]
     for key, role in PRESET_ROLES.items():
         lines.append(f"  {role.emoji} {key:10s} — {role.name}: {role.system_prompt[:50]}...")
@@ -254,16 +387,9 @@ class BattleToolWrapper:
         self.engine = BattleEngine(provider)
 
     def _run_async(self, coro):
-        """Run an async coroutine from a sync context, handling running loops."""
-        try:
-            asyncio.get_running_loop()
-            # We're inside a running loop — use a thread to run a new loop
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                return pool.submit(asyncio.run, coro).result(timeout=120)
-        except RuntimeError:
-            # No running loop — safe to use asyncio.run directly
-            return asyncio.run(coro)
+        """Run an async coroutine from a sync context (with or without a running loop)."""
+        # Runs on the shared background loop, so nothing blocks on (or nests in) the caller's loop
+        return run_coro_sync(coro, timeout=120)
 
     def battle(self, question: str = "", roles: str = "", **kw) -> str:
         if not question:
@@ -1,21 +1,37 @@
 """xiaoclaw CLI — interactive terminal with setup wizard & slash completion"""
 import sys
 import os
+import io
 import re
 import shlex
 import logging
+import logging.config
 import asyncio
-import readline
+import bisect
 import getpass
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .core import XiaClaw, XiaClawConfig, VERSION
+from ._version import VERSION
 from .errors import XError
 from .spinner import Spinner
-from .battle import BattleEngine, PRESET_ROLES, DEFAULT_BATTLE_ROLES, list_preset_roles
+
+# core/battle pull in openai + httpx; they're imported inside main() so
+# --help/--version and bad-argv exits don't pay for them
+if TYPE_CHECKING:
+    from .core import XiaClawConfig
+
+# Streamed replies are flushed in batches rather than once per token
+_STREAM_FLUSH_CHARS = 64
+_STREAM_FLUSH_SECS = 0.05
+
+# Resolved once: Path.home() does a pwd lookup every call
+XIAOCLAW_DIR = Path.home() / ".xiaoclaw"
+WELCOMED_FILE = XIAOCLAW_DIR / ".welcomed"
 
 # ── History persistence ───────────────────────────────────────
-HISTORY_FILE = Path.home() / ".xiaoclaw" / "history"
+HISTORY_FILE = XIAOCLAW_DIR / "history"
 MAX_HISTORY = 1000
 
 # ── Slash command registry ────────────────────────────────────
@@ -43,6 +59,25 @@ SLASH_COMMANDS = {
 }
 ALIASES = {"/q": "/quit", "/h": "/help", "/t": "/tools", "/s": "/sessions",
            "/m": "/memory", "/c": "/clear", "/a": "/analytics", "/v": "/version", "/exit": "/quit"}
+# /help output, built once
+_HELP_TEXT = "\n".join([
+    "\n  📋 可用命令:\n",
+    *(f"    {cmd:18s} {desc}" for cmd, desc in SLASH_COMMANDS.items()),
+    "\n  💡 示例:",
+    "    /battle 微服务还是单体架构？    多角色辩论分析",
+    "    /skill on github               启用 GitHub 技能",
+    "    /export json                   导出会话为 JSON",
+    "    /restore abc123                恢复历史会话",
+    "    /loglevel DEBUG                设置日志级别",
+    "    /analytics 30                  查看30天Token统计",
+    "\n  ⌨️ 快捷键:",
+    "    Tab                            命令补全",
+    "    Ctrl+C                         退出",
+    "    ↑/↓                            浏览历史命令",
+    "",
+])
+# Sorted once so Tab completion is a bisect prefix range, not a sort per keystroke
+_ALL_CMDS = tuple(sorted(SLASH_COMMANDS.keys() | ALIASES.keys()))
 
 # ── Tab completion ────────────────────────────────────────────
 class SlashCompleter:
@@ -58,13 +93,16 @@ class SlashCompleter:
 
     def complete(self, text, state):
         if state == 0:
+            import readline
             line = readline.get_line_buffer().lstrip()
             if line.startswith("/"):
                 parts = line.split()
                 if len(parts) == 1 and not line.endswith(" "):
                     # Complete command name
-                    all_cmds = list(SLASH_COMMANDS.keys()) + list(ALIASES.keys())
-                    self.matches = [c + " " for c in sorted(set(all_cmds)) if c.startswith(line)]
+                    lo = hi = bisect.bisect_left(_ALL_CMDS, line)
+                    while hi < len(_ALL_CMDS) and _ALL_CMDS[hi].startswith(line):
+                        hi += 1
+                    self.matches = [c + " " for c in _ALL_CMDS[lo:hi]]
                 elif len(parts) >= 1:
                     # Complete parameters
                     cmd = ALIASES.get(parts[0], parts[0])
@@ -80,6 +118,7 @@ class SlashCompleter:
 
 def _setup_readline():
     """Configure readline with completion and history persistence."""
+    import readline
     comp = SlashCompleter()
     readline.set_completer(comp.complete)
     readline.set_completer_delims(" \t\n")
@@ -101,6 +140,7 @@ def _setup_readline():
 def _save_history():
     """Persist command history to disk."""
     try:
+        import readline
         HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
         readline.write_history_file(str(HISTORY_FILE))
     except Exception:
@@ -121,7 +161,7 @@ def parse_slash_command(user_input: str) -> tuple:
 
 
 # ── Setup wizard ──────────────────────────────────────────────
-CONFIG_FILE = Path.home() / ".xiaoclaw" / "config.env"
+CONFIG_FILE = XIAOCLAW_DIR / "config.env"
 
 PROVIDER_PRESETS = {
     "1": {
@@ -151,8 +191,9 @@ PROVIDER_PRESETS = {
 }
 
 
-def _run_setup_wizard() -> XiaClawConfig:
+async def _run_setup_wizard() -> "XiaClawConfig":
     """Interactive first-run setup wizard. Returns config."""
+    from .core import XiaClawConfig
     print()
     print("  ╔══════════════════════════════════════╗")
     print("  ║   🐾 xiaoclaw 首次设置向导           ║")
@@ -210,12 +251,12 @@ def _run_setup_wizard() -> XiaClawConfig:
     # Test connection
     print()
     print("  🔄 测试连接...", end="", flush=True)
-    import asyncio as _aio
     from openai import AsyncOpenAI
 
     async def _test():
         try:
-            client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+            # One bounded attempt, so a bad URL / firewall can't stall the wizard
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=10, max_retries=0)
             resp = await client.chat.completions.create(
                 model=default_model,
                 messages=[{"role": "user", "content": "hi"}],
@@ -225,18 +266,8 @@ def _run_setup_wizard() -> XiaClawConfig:
         except Exception as e:
             return False, str(e)
 
-    # 兼容已有事件循环的情况（如 nest_asyncio 或 Jupyter）
-    try:
-        loop = _aio.get_running_loop()
-    except RuntimeError:
-        loop = None
-    
-    if loop and loop.is_running():
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            success, msg = pool.submit(lambda: _aio.run(_test())).result(timeout=30)
-    else:
-        success, msg = _aio.run(_test())
+    # Runs on main()'s loop — both first-run setup and in-REPL /setup await the wizard
+    success, msg = await _test()
     if success:
         print(f" ✅ 成功！({default_model})")
     else:
@@ -273,14 +304,21 @@ def _run_setup_wizard() -> XiaClawConfig:
 
 def _load_saved_config():
     """Load config from ~/.xiaoclaw/config.env if exists."""
-    if not CONFIG_FILE.exists():
+    try:
+        f = CONFIG_FILE.open(encoding="utf-8")
+    except FileNotFoundError:
         return False
-    for line in CONFIG_FILE.read_text(encoding="utf-8").strip().split("\n"):
-        line = line.strip()
-        if "=" in line and not line.startswith("#"):
-            key, val = line.split("=", 1)
-            if key.strip() and val.strip() and key.strip() not in os.environ:
-                os.environ[key.strip()] = val.strip()
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+            eq = line.find("=")
+            if eq <= 0:
+                continue
+            key, val = line[:eq].strip(), line[eq + 1:].strip()
+            if key and val and key not in os.environ:
+                os.environ[key] = val
     return True
 
 
@@ -305,74 +343,149 @@ def _needs_setup() -> bool:
 
 
 # ── Session memory save ──────────────────────────────────────
+def _suggest_commands(cmd: str) -> list:
+    """Known commands sharing the typo's prefix, else fuzzy matches (e.g. /hlep → /help)."""
+    close = [c for c in SLASH_COMMANDS if c.startswith(cmd[:3])]
+    if close:
+        return close
+    import difflib  # error path only
+    return difflib.get_close_matches(cmd, SLASH_COMMANDS.keys(), n=3, cutoff=0.6)
+
+
+def _banner(claw):
+    """Print the version / active model / ready line."""
+    p = claw.providers.active
+    name = p.current_model if p else "no LLM"
+    ok = "✓" if p and p.ready else "✗"
+    print(f"\n  🐾 xiaoclaw v{VERSION} | {name} {ok}\n")
+
+
 async def _save_session_memory(claw):
     try:
         msgs = claw.session.messages
         if len(msgs) < 2:
             return
-        entries = []
+        entries = ["## Session Summary"]
         for msg in msgs:
-            if msg.get("role") == "user":
-                content = msg.get("content", "")
-                if isinstance(content, str) and content.strip() and not content.startswith("/"):
-                    entries.append(f"- User: {content[:100]}")
-        if entries:
-            summary = f"## Session Summary\n" + "\n".join(entries[:10])
-            claw.memory.append_daily(summary)
+            if msg.get("role") != "user":
+                continue
+            content = msg.get("content") or ""
+            if not isinstance(content, str) or not content.strip() or content.startswith("/"):
+                continue
+            entries.append(f"- User: {content[:100]}")
+            if len(entries) > 10:  # header + first 10 user messages
+                break
+        if len(entries) > 1:
+            claw.memory.append_daily("\n".join(entries))
     except Exception:
         pass
 
 
+# ── Argument parsing ──────────────────────────────────────────
+VALUE_OPTS = frozenset({"--config", "--log-level"})  # options that take a value
+VALID_OPTS = frozenset({"--setup", "--web", "--test", "--debug", "--version", "--help", "-v", "-h"}) | VALUE_OPTS
+
+
+def _parse_argv(argv: list) -> tuple:
+    """Single pass over argv → (set of flags, {option: value})."""
+    flags, opts = set(), {}
+    it = iter(argv)
+    for arg in it:
+        if arg in VALUE_OPTS:
+            opts[arg] = next(it, None)
+        else:
+            flags.add(arg)
+    return flags, opts
+
+
+# ── Session export ───────────────────────────────────────────
+def _export_session(session, fmt: str = "md") -> Path:
+    """Write the session to /tmp as Markdown or JSON and return the path."""
+    msgs = session.messages
+    # Sanitize session_id to prevent path traversal
+    safe_id = re.sub(r'[^a-zA-Z0-9_-]', '', session.session_id)
+    if "json" in fmt:
+        path = Path(f"/tmp/xiaoclaw_export_{safe_id}.json")
+        try:
+            import orjson
+            # Same 2-space layout as the stdlib branch, so exports don't
+            # depend on whether xiaoclaw[fast] is installed
+            path.write_bytes(orjson.dumps(msgs, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        except (ImportError, TypeError):
+            import json
+            with path.open("w", encoding="utf-8") as f:
+                json.dump(msgs, f, ensure_ascii=False, indent=2)
+        return path
+
+    buf = io.StringIO()
+    buf.write(f"# Session {session.session_id}\n\n")
+    for m in msgs:
+        content = m.get("content", "")
+        if isinstance(content, str) and content.strip():
+            buf.write("**")
+            buf.write(m.get("role", "?"))
+            buf.write("**: ")
+            buf.write(content)
+            buf.write("\n\n")
+    path = Path(f"/tmp/xiaoclaw_export_{safe_id}.md")
+    path.write_bytes(buf.getvalue().encode("utf-8"))
+    return path
+
+
 # ── Main ──────────────────────────────────────────────────────
 async def main():
+    from .core import XiaClaw, XiaClawConfig
+    from .battle import BattleEngine, PRESET_ROLES, DEFAULT_BATTLE_ROLES, list_preset_roles
+    preset_roles, default_roles = ", ".join(PRESET_ROLES), ", ".join(DEFAULT_BATTLE_ROLES)
+
+    flags, opts = _parse_argv(sys.argv[1:])
     # Config path override (parse first, before any branches that use it)
-    config_path = None
-    for i, arg in enumerate(sys.argv):
-        if arg == "--config" and i + 1 < len(sys.argv):
-            config_path = sys.argv[i + 1]
+    config_path = opts.get("--config")
 
     # Setup wizard (skip for --test mode - already handled in _cli_entry for version/help/web)
     # For --test mode, use a minimal config or env vars
-    if "--test" in sys.argv:
+    if "--test" in flags:
         config = XiaClawConfig.from_env()
         if not config.api_key:
             # Use a dummy key for testing
             config = XiaClawConfig(api_key="test-key-for-self-test")
-    elif "--setup" in sys.argv or _needs_setup():
-        config = _run_setup_wizard()
+    elif "--setup" in flags or _needs_setup():
+        config = await _run_setup_wizard()
     else:
         config = XiaClawConfig.from_yaml(config_path) if config_path else XiaClawConfig.from_env()
 
-    # Logging
-    if "--debug" in sys.argv:
-        logging.getLogger().setLevel(logging.DEBUG)
-        logging.getLogger("xiaoclaw").setLevel(logging.DEBUG)
-        logging.getLogger("httpx").setLevel(logging.INFO)
+    # Logging — core only installs a NullHandler; the CLI owns the console handler
+    if "--debug" in flags:
+        root_level, levels = "DEBUG", {"xiaoclaw": "DEBUG", "httpx": "INFO"}
     else:
-        for name in ("", "xiaoclaw", "httpx", "httpcore", "openai"):
-            logging.getLogger(name).setLevel(logging.WARNING)
-
-    for i, arg in enumerate(sys.argv):
-        if arg == "--log-level" and i + 1 < len(sys.argv):
-            lvl = sys.argv[i + 1].upper()
-            if lvl in ("DEBUG", "INFO", "WARNING", "ERROR"):
-                logging.getLogger().setLevel(getattr(logging, lvl))
+        root_level, levels = "WARNING", dict.fromkeys(("xiaoclaw", "httpx", "httpcore", "openai"), "WARNING")
+    lvl = (opts.get("--log-level") or "").upper()
+    if lvl in ("DEBUG", "INFO", "WARNING", "ERROR"):
+        root_level = lvl
+    logging.config.dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"plain": {"format": "%(message)s"}},
+        "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "plain"}},
+        "root": {"level": root_level, "handlers": ["console"]},
+        "loggers": {name: {"level": level} for name, level in levels.items()},
+    })
 
     claw = XiaClaw(config)
-    p = claw.providers.active
-    model_name = p.current_model if p else "no LLM"
-    ready = "✓" if (p and p.ready) else "✗"
-    print(f"\n  🐾 xiaoclaw v{VERSION} | {model_name} {ready}\n")
+    _banner(claw)
 
-    if "--test" in sys.argv:
+    if "--test" in flags:
         logging.getLogger().setLevel(logging.INFO)
         logging.getLogger("xiaoclaw").setLevel(logging.INFO)
         print("--- Self Test ---")
-        from .providers import test_providers; test_providers()
-        from .session import test_session; test_session()
-        from .memory import test_memory; test_memory()
-        from .skills import test_skills; test_skills()
-        from .web import test_web; test_web()
+        from .providers import test_providers
+        from .session import test_session
+        from .memory import test_memory
+        from .skills import test_skills
+        from .web import test_web
+        # Module self-tests are independent and I/O-bound (test_web hits the network), so overlap them
+        await asyncio.gather(*(asyncio.to_thread(fn) for fn in
+                               (test_providers, test_session, test_memory, test_skills, test_web)))
         for msg in ["你好", "工具列表", "1+1等于几？"]:
             r = await claw.handle_message(msg)
             print(f"  > {msg}\n  < {r[:200]}\n")
@@ -382,41 +495,196 @@ async def main():
     _setup_readline()
 
     # Show quick help on first run
-    if not (Path.home() / ".xiaoclaw" / ".welcomed").exists():
+    if not WELCOMED_FILE.exists():
         print("  💡 输入 / 然后按 Tab 查看所有命令")
         print("  💡 输入 /setup 重新配置 API")
         print("  💡 输入 /help 查看帮助")
         print()
-        (Path.home() / ".xiaoclaw").mkdir(parents=True, exist_ok=True)
-        (Path.home() / ".xiaoclaw" / ".welcomed").touch()
+        XIAOCLAW_DIR.mkdir(parents=True, exist_ok=True)
+        WELCOMED_FILE.touch()
 
     # ── Command handlers ──────────────────────────────
-    def cmd_help():
-        print("\n  📋 可用命令:\n")
-        for cmd, desc in SLASH_COMMANDS.items():
-            print(f"    {cmd:18s} {desc}")
-        print("\n  💡 示例:")
-        print("    /battle 微服务还是单体架构？    多角色辩论分析")
-        print("    /skill on github               启用 GitHub 技能")
-        print("    /export json                   导出会话为 JSON")
-        print("    /restore abc123                恢复历史会话")
-        print("    /loglevel DEBUG                设置日志级别")
-        print("    /analytics 30                  查看30天Token统计")
-        print("\n  ⌨️ 快捷键:")
-        print("    Tab                            命令补全")
-        print("    Ctrl+C                         退出")
-        print("    ↑/↓                            浏览历史命令")
-        print()
+    async def cmd_setup(user_input):
+        nonlocal claw
+        await _run_setup_wizard()
+        claw = XiaClaw(XiaClawConfig.from_env())
+        _banner(claw)
+
+    def cmd_skills(user_input):
+        for n in claw.skills.list_skills():
+            sk = claw.skills.get_skill(n)
+            status = "✓" if sk.active else "○"
+            print(f"  {status} {n}: {list(sk.tools.keys())}")
+
+    def cmd_skill(user_input):
+        parts = user_input.split()
+        if len(parts) >= 3:
+            action, sname = parts[1].lower(), parts[2]
+            sk = claw.skills.get_skill(sname)
+            if sk:
+                sk.active = action == "on"
+                print(f"  {sname}: {'✓ 已启用' if sk.active else '○ 已禁用'}")
+            else:
+                print(f"  ❌ 技能不存在: {sname}")
+        else:
+            print("  用法: /skill on|off <name>")
+
+    def cmd_model(user_input):
+        for pi in claw.providers.list_providers():
+            print(f"  {'→' if pi['active'] else ' '} {pi['name']}: {pi['model']}")
+
+    def cmd_sessions(user_input):
+        sessions = claw.session_mgr.list_sessions()
+        if sessions:
+            for s in sessions:
+                print(f"  📝 {s['session_id']} ({s['size']}B)")
+        else:
+            print("  (无历史会话)")
+
+    def cmd_restore(user_input):
+        parts = user_input.split()
+        if len(parts) >= 2:
+            sid = parts[1]
+            restored = claw.session_mgr.restore(sid)
+            if restored:
+                claw.session = restored
+                print(f"  ✅ 已恢复会话 {sid} ({len(restored.messages)} 条消息)")
+            else:
+                print(f"  ❌ 会话不存在: {sid}")
+        else:
+            print("  用法: /restore <session_id>")
+
+    def cmd_export(user_input):
+        parts = user_input.split()
+        path = _export_session(claw.session, parts[1] if len(parts) >= 2 else "md")
+        print(f"  📄 已导出到 {path}")
+
+    def cmd_loglevel(user_input):
+        parts = user_input.split()
+        if len(parts) >= 2:
+            lvl = parts[1].upper()
+            if lvl in ("DEBUG", "INFO", "WARNING", "ERROR"):
+                logging.getLogger().setLevel(getattr(logging, lvl))
+                print(f"  日志级别: {lvl}")
+            else:
+                print("  可选: DEBUG INFO WARNING ERROR")
+        else:
+            print(f"  当前: {logging.getLevelName(logging.getLogger().level)}")
+
+    def cmd_reload(user_input):
+        ok = claw.reload_config(config_path or "config.yaml")
+        print(f"  {'✅ 配置已重载' if ok else '❌ 重载失败'}")
+
+    battle_engine = [None, None]  # (provider, engine) — rebuilt only when the provider changes
+
+    def get_battle_engine():
+        """Active provider's BattleEngine, or None (after printing why) if no LLM is ready."""
+        p = claw.providers.active
+        if not (p and p.ready):
+            print("  ❌ LLM未配置"); return None
+        if battle_engine[0] is not p:
+            battle_engine[:] = [p, BattleEngine(p)]
+        return battle_engine[1]
+
+    async def cmd_battle_custom(user_input):
+        parts = user_input.split(None, 2)
+        if len(parts) < 3:
+            print("  用法: /battle-custom <角色1,角色2,...> <问题>")
+            print(f"  可用角色: {preset_roles}")
+            return
+        role_str, question = parts[1], parts[2]
+        role_keys = [r.strip() for r in role_str.split(",") if r.strip()]
+        engine = get_battle_engine()
+        if not engine:
+            return
+        print(f"\n  🏢 Battle开始... (角色: {', '.join(role_keys)})\n")
+        result = await engine.battle(question, role_keys=role_keys)
+        print(result["formatted"])
+
+    async def cmd_battle(user_input):
+        question = user_input[len("/battle"):].strip()
+        if not question:
+            print("  用法: /battle <问题>")
+            print(f"  默认角色: {default_roles}")
+            return
+        engine = get_battle_engine()
+        if not engine:
+            return
+        print(f"\n  🏢 Battle开始... (角色: {default_roles})\n")
+        result = await engine.battle(question)
+        print(result["formatted"])
+
+    def cmd_analytics(user_input):
+        parts = user_input.split()
+        days = 7
+        if len(parts) >= 2:
+            try:
+                days = int(parts[1])
+            except ValueError:
+                pass
+        print(claw.analytics.print_report(days))
+
+    # (registry, version, rendered output); /setup swaps in a new registry
+    tools_line = [None, None, ""]
+
+    def cmd_tools(user_input):
+        reg = claw.tools
+        if tools_line[0] is not reg or tools_line[1] != reg.version:
+            tools_line[:] = [reg, reg.version, f"  🔧 {', '.join(reg.list_names())}"]
+        print(tools_line[2])
+
+    memory_len = [None, 0]  # (path, mtime_ns, size) → char count of MEMORY.md
+
+    def cmd_memory(user_input):
+        path = claw.memory.memory_file
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            memory_len[:] = [None, 0]
+        else:
+            key = (path, st.st_mtime_ns, st.st_size)
+            if memory_len[0] != key:
+                memory_len[:] = [key, len(claw.memory.read_memory())]
+        print(f"  🧠 MEMORY.md: {memory_len[1]} chars")
 
-    SIMPLE_CMDS = {
-        "/help": cmd_help,
-        "/tools": lambda: print(f"  🔧 {', '.join(claw.tools.list_names())}"),
-        "/memory": lambda: print(f"  🧠 MEMORY.md: {len(claw.memory.read_memory())} chars"),
-        "/clear": lambda: (setattr(claw, 'session', claw.session_mgr.new_session()), print("  ✨ 新会话已创建")),
-        "/stats": lambda: print(f"  📊 {claw.stats.summary()}"),
-        "/version": lambda: print(f"  🐾 xiaoclaw v{VERSION}"),
-        "/battle-roles": lambda: print(list_preset_roles()),
+    def cmd_clear(user_input):
+        claw.session = claw.session_mgr.new_session()
+        print("  ✨ 新会话已创建")
+
+    QUIT = object()  # returned by a handler to leave the REPL
+
+    async def cmd_quit(user_input):
+        _save_history()
+        claw.session.save()
+        await _save_session_memory(claw)
+        print("Bye!")
+        return QUIT
+
+    # One dict lookup per input line; handlers get the raw input and may be async
+    CMDS = {
+        "/quit": cmd_quit,
+        "/help": lambda _: print(_HELP_TEXT),
+        "/tools": cmd_tools,
+        "/memory": cmd_memory,
+        "/clear": cmd_clear,
+        "/stats": lambda _: print(f"  📊 {claw.stats.summary()}"),
+        "/version": lambda _: print(f"  🐾 xiaoclaw v{VERSION}"),
+        "/battle-roles": lambda _: print(list_preset_roles()),
+        "/setup": cmd_setup,
+        "/skills": cmd_skills,
+        "/skill": cmd_skill,
+        "/model": cmd_model,
+        "/sessions": cmd_sessions,
+        "/restore": cmd_restore,
+        "/export": cmd_export,
+        "/loglevel": cmd_loglevel,
+        "/reload": cmd_reload,
+        "/battle-custom": cmd_battle_custom,
+        "/battle": cmd_battle,
+        "/analytics": cmd_analytics,
     }
+    # Aliases resolve in the same lookup instead of a second ALIASES.get()
+    CMDS.update({alias: CMDS[target] for alias, target in ALIASES.items() if target in CMDS})
 
     # ── Main loop ─────────────────────────────────────
     print("─" * 50)
@@ -434,172 +702,24 @@ async def main():
         if not user_input:
             continue
 
-        cmd = user_input.lower().split()[0] if user_input.startswith("/") else ""
-        cmd = ALIASES.get(cmd, cmd)
-
-        # Quit
-        if cmd in ("/quit",):
-            _save_history()
-            claw.session.save()
-            await _save_session_memory(claw)
-            print("Bye!"); break
-
-        # Simple commands
-        if cmd in SIMPLE_CMDS:
-            SIMPLE_CMDS[cmd](); continue
-
-        # Setup wizard
-        if cmd == "/setup":
-            _run_setup_wizard()
-            claw = XiaClaw(XiaClawConfig.from_env())
-            p = claw.providers.active
-            model_name = p.current_model if p else "no LLM"
-            ready = "✓" if (p and p.ready) else "✗"
-            print(f"\n  🐾 xiaoclaw v{VERSION} | {model_name} {ready}\n")
-            continue
-
-        # Skills
-        if cmd == "/skills":
-            for n in claw.skills.list_skills():
-                sk = claw.skills.get_skill(n)
-                status = "✓" if sk.active else "○"
-                print(f"  {status} {n}: {list(sk.tools.keys())}")
-            continue
-        if cmd == "/skill":
-            parts = user_input.split()
-            if len(parts) >= 3:
-                action, sname = parts[1].lower(), parts[2]
-                sk = claw.skills.get_skill(sname)
-                if sk:
-                    sk.active = action == "on"
-                    print(f"  {sname}: {'✓ 已启用' if sk.active else '○ 已禁用'}")
-                else:
-                    print(f"  ❌ 技能不存在: {sname}")
-            else:
-                print("  用法: /skill on|off <name>")
-            continue
-
-        # Model
-        if cmd == "/model":
-            for pi in claw.providers.list_providers():
-                print(f"  {'→' if pi['active'] else ' '} {pi['name']}: {pi['model']}")
-            continue
-
-        # Sessions
-        if cmd == "/sessions":
-            sessions = claw.session_mgr.list_sessions()
-            if sessions:
-                for s in sessions:
-                    print(f"  📝 {s['session_id']} ({s['size']}B)")
-            else:
-                print("  (无历史会话)")
-            continue
-        if cmd == "/restore":
-            parts = user_input.split()
-            if len(parts) >= 2:
-                sid = parts[1]
-                restored = claw.session_mgr.restore(sid)
-                if restored:
-                    claw.session = restored
-                    print(f"  ✅ 已恢复会话 {sid} ({len(restored.messages)} 条消息)")
-                else:
-                    print(f"  ❌ 会话不存在: {sid}")
-            else:
-                print("  用法: /restore <session_id>")
-            continue
-
-        # Export
-        if cmd == "/export":
-            parts = user_input.split()
-            fmt = parts[1] if len(parts) >= 2 else "md"
-            msgs = claw.session.messages
-            if "json" in fmt:
-                import json
-                out = json.dumps(msgs, ensure_ascii=False, indent=2)
-                ext = "json"
-            else:
-                lines = [f"# Session {claw.session.session_id}\n"]
-                for m in msgs:
-                    role = m.get("role", "?")
-                    content = m.get("content", "")
-                    if isinstance(content, str) and content.strip():
-                        lines.append(f"**{role}**: {content}\n")
-                out = "\n".join(lines)
-                ext = "md"
-            # Sanitize session_id to prevent path traversal
-            safe_id = re.sub(r'[^a-zA-Z0-9_-]', '', claw.session.session_id)
-            path = f"/tmp/xiaoclaw_export_{safe_id}.{ext}"
-            Path(path).write_text(out, encoding="utf-8")
-            print(f"  📄 已导出到 {path}")
-            continue
-
-        # Log level
-        if cmd == "/loglevel":
-            parts = user_input.split()
-            if len(parts) >= 2:
-                lvl = parts[1].upper()
-                if lvl in ("DEBUG", "INFO", "WARNING", "ERROR"):
-                    logging.getLogger().setLevel(getattr(logging, lvl))
-                    print(f"  日志级别: {lvl}")
-                else:
-                    print("  可选: DEBUG INFO WARNING ERROR")
-            else:
-                print(f"  当前: {logging.getLevelName(logging.getLogger().level)}")
-            continue
-
-        # Reload
-        if cmd == "/reload":
-            ok = claw.reload_config(config_path or "config.yaml")
-            print(f"  {'✅ 配置已重载' if ok else '❌ 重载失败'}")
-            continue
-
-        # Battle
-        if cmd == "/battle-custom":
-            parts = user_input.split(None, 2)
-            if len(parts) < 3:
-                print("  用法: /battle-custom <角色1,角色2,...> <问题>")
-                print(f"  可用角色: {', '.join(PRESET_ROLES.keys())}")
-                continue
-            role_str, question = parts[1], parts[2]
-            role_keys = [r.strip() for r in role_str.split(",") if r.strip()]
-            p = claw.providers.active
-            if not (p and p.ready):
-                print("  ❌ LLM未配置"); continue
-            print(f"\n  🏢 Battle开始... (角色: {', '.join(role_keys)})\n")
-            engine = BattleEngine(p)
-            result = await engine.battle(question, role_keys=role_keys)
-            print(result["formatted"])
-            continue
-        if cmd == "/battle":
-            question = user_input[len("/battle"):].strip()
-            if not question:
-                print("  用法: /battle <问题>")
-                print(f"  默认角色: {', '.join(DEFAULT_BATTLE_ROLES)}")
-                continue
-            p = claw.providers.active
-            if not (p and p.ready):
-                print("  ❌ LLM未配置"); continue
-            print(f"\n  🏢 Battle开始... (角色: {', '.join(DEFAULT_BATTLE_ROLES)})\n")
-            engine = BattleEngine(p)
-            result = await engine.battle(question)
-            print(result["formatted"])
-            continue
-
-        # Analytics
-        if cmd == "/analytics":
-            parts = user_input.split()
-            days = 7
-            if len(parts) >= 2:
-                try:
-                    days = int(parts[1])
-                except ValueError:
-                    pass
-            print(claw.analytics.print_report(days))
+        if user_input[0] == "/":
+            end = user_input.find(" ")
+            cmd = (user_input[:end] if end > 0 else user_input).lower()
+        else:
+            cmd = ""
+
+        handler = CMDS.get(cmd)
+        if handler:
+            result = handler(user_input)
+            if asyncio.iscoroutine(result):
+                result = await result
+            if result is QUIT:
+                break
             continue
 
-        # Unknown slash command
-        if user_input.startswith("/") and cmd not in SLASH_COMMANDS:
-            close = [c for c in SLASH_COMMANDS if c.startswith(cmd[:3])]
+        # Unknown slash command (every known one and its aliases is in CMDS)
+        if cmd:
+            close = _suggest_commands(cmd)
             if close:
                 print(f"  ❓ 未知命令。你是不是想输入: {', '.join(close)}")
             else:
@@ -610,27 +730,53 @@ async def main():
         spinner = Spinner("思考中")
         spinner.start()
         first_chunk = True
-        async for chunk in claw.handle_message_stream(user_input):
+        # Batch writes/flushes: the first chunk goes out at once, later ones on
+        # newline, every _STREAM_FLUSH_CHARS chars, or once _STREAM_FLUSH_SECS
+        # pass with text buffered — even while the next chunk is still pending
+        # (a tool call or slow round must not hide what was already said)
+        write, flush, clock = sys.stdout.write, sys.stdout.flush, time.monotonic
+        buf, pending, last_flush = [], 0, 0.0
+        stream = claw.handle_message_stream(user_input)
+        while True:
+            if buf:
+                # Not wait_for(): a timeout would cancel, and so close, the stream
+                nxt = asyncio.ensure_future(stream.__anext__())
+                done, _ = await asyncio.wait({nxt}, timeout=max(0.0, last_flush + _STREAM_FLUSH_SECS - clock()))
+                if not done:
+                    write("".join(buf)); flush()
+                    buf.clear(); pending, last_flush = 0, clock()
+            else:
+                nxt = stream.__anext__()
+            try:
+                chunk = await nxt
+            except StopAsyncIteration:
+                break
             if first_chunk:
                 spinner.stop()
-                print(f"\n🐾 xiaoclaw: ", end="", flush=True)
+                write(f"\n🐾 xiaoclaw: ")
                 first_chunk = False
-            print(chunk, end="", flush=True)
+            buf.append(chunk)
+            pending += len(chunk)
+            now = clock()
+            if pending >= _STREAM_FLUSH_CHARS or "\n" in chunk or now - last_flush >= _STREAM_FLUSH_SECS:
+                write("".join(buf)); flush()
+                buf.clear(); pending, last_flush = 0, now
         if first_chunk:
             spinner.stop()
-            print(f"\n🐾 xiaoclaw: ", end="", flush=True)
-        print()
+            write(f"\n🐾 xiaoclaw: ")
+        write("".join(buf) + "\n"); flush()
 
 
 def _cli_entry():
     """Entry point for `xiaoclaw` console command."""
+    flags, _ = _parse_argv(sys.argv[1:])
     # Handle --version outside asyncio (before any async setup)
-    if "--version" in sys.argv or "-v" in sys.argv:
+    if "--version" in flags or "-v" in flags:
         print(f"xiaoclaw v{VERSION}")
         return
 
     # Handle --help outside asyncio
-    if "--help" in sys.argv or "-h" in sys.argv:
+    if "--help" in flags or "-h" in flags:
         print(f"xiaoclaw v{VERSION} - Lightweight AI Agent")
         print()
         print("用法:")
@@ -642,30 +788,24 @@ def _cli_entry():
         print()
         print("选项:")
         print("  --debug               启用调试日志")
+        print("  --config <FILE>       使用指定的 YAML 配置文件")
         print("  --log-level <LEVEL>   设置日志级别 (DEBUG/INFO/WARNING/ERROR)")
         print()
         print("详情: https://github.com/upsightx/xiaoclaw")
         return
 
-    # Collect valid CLI options
-    validopts = {"--setup", "--web", "--test", "--debug", "--version", "--help", "-v", "-h", "--log-level"}
-    
     # Check for invalid arguments
-    for arg in sys.argv[1:]:
-        if arg.startswith("-") and arg not in validopts:
+    for arg in flags:
+        if arg.startswith("-") and arg not in VALID_OPTS:
             print(f"❌ 未知选项: {arg}")
             print("   使用 --help 查看可用选项")
             sys.exit(1)
 
-    # Handle --test BEFORE setup wizard check
-    if "--test" in sys.argv:
-        # Skip setup wizard for test mode
-        pass
-
     # Handle --web outside asyncio (uvicorn manages its own event loop)
-    if "--web" in sys.argv:
+    if "--web" in flags:
+        logging.basicConfig(level=logging.WARNING, format="%(message)s")
         try:
-            from .config import XiaClawConfig
+            from .core import XiaClawConfig
             config = XiaClawConfig.from_env()
             _run_webui(config)
         except ImportError as e:
@@ -686,7 +826,7 @@ def _cli_entry():
         _save_history()
         print("\nBye!")
     except Exception as e:
-        if "--debug" in sys.argv:
+        if "--debug" in flags:
             import traceback
             traceback.print_exc()
         else:
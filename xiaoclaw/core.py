@@ -1,35 +1,36 @@
 #!/usr/bin/env python3
 """xiaoclaw - Lightweight AI Agent compatible with OpenClaw ecosystem"""
 import os
-import re
 import json
 import asyncio
+import functools
 import inspect
+import itertools
 import logging
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterable
 from dataclasses import dataclass
 
 from .analytics import Analytics
 from .providers import ProviderManager, ProviderConfig
 from .session import Session, SessionManager, count_messages_tokens
-from .memory import MemoryManager
+from .memory import MemoryManager, BOOTSTRAP_FILES
 from .skills import SkillRegistry, register_builtin_skills
 from .tools import ToolRegistry
 from .plugins import PluginManager
 from .subagent import SubagentManager
 from .battle import BattleToolWrapper
-from .utils import SecurityManager, RateLimiter, TokenStats, HookManager
+from .utils import SecurityManager, RateLimiter, TokenStats, HookManager, strip_think
 
-logging.basicConfig(level=logging.WARNING, format='%(message)s')
 logger = logging.getLogger("xiaoclaw")
+# Library default: no output until an entry point (cli / app) configures logging
+logger.addHandler(logging.NullHandler())
 # Suppress noisy httpx logs
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
-VERSION = "0.3.1"
+from ._version import VERSION
 
-# Pre-compiled regex for stripping <think> tags (used in hot path)
-_THINK_RE = re.compile(r'<think>.*?</think>\s*', re.DOTALL)
 
 # ─── Friendly LLM Error Messages ─────────────────────
 LLM_ERROR_MESSAGES = {
@@ -144,6 +145,64 @@ def _friendly_tool_display(name: str, args: dict) -> str:
     return f"⚙ {name}..."
 
 
+# ─── Bootstrap Context ────────────────────────────────
+
+def _scan_md(directory: Path) -> Dict[str, Tuple[str, int, int]]:
+    """One scandir sweep → {name: (path, mtime_ns, size)} for the *.md files in `directory`."""
+    found = {}
+    try:
+        with os.scandir(directory) as it:
+            for e in it:
+                if e.name.endswith(".md") and e.is_file():
+                    st = e.stat()
+                    found[e.name] = (e.path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    return found
+
+
+def _bootstrap_key(memory: MemoryManager, days: int = 2) -> Tuple:
+    """Cache key for the bootstrap context: every input file with its mtime/size."""
+    ws = _scan_md(memory.workspace)
+    files = [(name, ws[name]) for name in BOOTSTRAP_FILES if name in ws]
+    mem = ws.get(memory.memory_file.name)
+    daily = _scan_md(memory.memory_dir)
+    today = datetime.now()
+    dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    return (str(memory.workspace.resolve()), tuple(files), mem,
+            tuple((d, daily[f"{d}.md"]) for d in dates if f"{d}.md" in daily))
+
+
+@functools.lru_cache(maxsize=8)
+def _render_bootstrap(workspace: str, files: Tuple, mem: Optional[Tuple], daily: Tuple) -> str:
+    """Read and render the bootstrap files named by a `_bootstrap_key()` result.
+
+    Keyed on mtimes, so repeated XiaClaw() constructions and /clear reuse
+    the rendered text until one of the files changes.
+    """
+    def read(path: str) -> str:
+        try:
+            return Path(path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.debug("Failed to read %s: %s", path, e)
+            return ""
+
+    parts = []
+    for name, (path, _, _) in files:
+        content = read(path)
+        if content:
+            parts.append(f"## {name}\n{content[:3000]}")
+    if mem:
+        content = read(mem[0])
+        if content:
+            parts.append(f"## MEMORY.md (Long-term Memory)\n{content[:2000]}")
+    for date, (path, _, _) in daily:
+        content = read(path)
+        if content:
+            parts.append(f"## memory/{date}.md (Daily Notes)\n{content[:1500]}")
+    return "\n\n".join(parts)
+
+
 # ─── xiaoclaw Core ────────────────────────────────────
 
 class XiaClaw:
@@ -198,9 +257,11 @@ class XiaClaw:
         # Bootstrap system prompt (lazy: only on first use)
         self._bootstrap_context: Optional[str] = None
 
-        # Cached system prompt and tool definitions (invalidated on config/skill changes)
+        # Cached system prompt and tool definitions (invalidated on config reload
+        # and whenever tools.version moves, e.g. a ClawHub install mid-conversation)
         self._cached_system_prompt: Optional[str] = None
         self._cached_openai_functions: Optional[List[Dict]] = None
+        self._cached_tools_version = self.tools.version
 
         # Config hot-reload watcher
         self._config_path: Optional[str] = None
@@ -391,25 +452,7 @@ class XiaClaw:
 
     def _load_bootstrap(self) -> str:
         """Read AGENTS.md, SOUL.md, USER.md, IDENTITY.md, MEMORY.md for system prompt."""
-        parts = []
-        # Read workspace context files
-        for name in ["AGENTS.md", "SOUL.md", "USER.md", "IDENTITY.md"]:
-            fp = self.workspace / name
-            if fp.exists():
-                try:
-                    content = fp.read_text(encoding="utf-8")
-                    parts.append(f"## {name}\n{content[:3000]}")
-                except (OSError, UnicodeDecodeError) as e:
-                    logger.debug(f"Failed to read {name}: {e}")
-        # Read MEMORY.md (long-term memory)
-        memory_content = self.memory.read_memory()
-        if memory_content:
-            parts.append(f"## MEMORY.md (Long-term Memory)\n{memory_content[:2000]}")
-        # Read recent daily memory
-        daily = self.memory.read_recent_daily(days=2)
-        for date, content in daily.items():
-            parts.append(f"## memory/{date}.md (Daily Notes)\n{content[:1500]}")
-        return "\n\n".join(parts)
+        return _render_bootstrap(*_bootstrap_key(self.memory))
 
     @property
     def bootstrap_context(self) -> str:
@@ -426,8 +469,14 @@ class XiaClaw:
             self._user_sessions[user_id] = self.session_mgr.new_session(f"user-{user_id[:8]}")
         return self._user_sessions[user_id]
 
+    def _check_tools_version(self):
+        if self._cached_tools_version != self.tools.version:
+            self._cached_tools_version = self.tools.version
+            self._invalidate_caches()
+
     def _get_openai_functions(self) -> List[Dict]:
         """Cached openai function definitions."""
+        self._check_tools_version()
         if self._cached_openai_functions is None:
             self._cached_openai_functions = self.tools.openai_functions()
         return self._cached_openai_functions
@@ -454,6 +503,7 @@ class XiaClaw:
             logger.debug(f"Config hot-reload check failed: {e}")
 
     def _system_prompt(self) -> str:
+        self._check_tools_version()
         if self._cached_system_prompt is not None:
             return self._cached_system_prompt
         prompt = self._build_system_prompt()
@@ -565,29 +615,33 @@ class XiaClaw:
         logger.info(f"Compacting: {tokens} tokens > {self.config.compaction_threshold}")
         self.memory.flush_important(self.session.messages)
 
-        n = len(self.session.messages)
+        msgs = self.session.messages
+        n = len(msgs)
         if n <= 4:
             return
 
-        old_msgs = self.session.messages[:n - 4]
-        recent = self.session.messages[n - 4:]
-
-        summary = await self._llm_summarize(old_msgs)
+        # Read the head through islice and replace it in place below, rather
+        # than copying it and the 4-message tail into fresh lists
+        summary = await self._llm_summarize(itertools.islice(msgs, n - 4))
         if not summary:
+            # Only the last 10 text messages are kept: walk back from the
+            # newest old message and stop there instead of rendering them all
             summary_text = []
-            for m in old_msgs:
+            for i in range(n - 5, -1, -1):
+                m = msgs[i]
                 c = m.get("content", "")
                 if isinstance(c, str) and c.strip():
                     summary_text.append(f"{m['role']}: {c[:100]}")
-            summary = "[Compacted]\n" + "\n".join(summary_text[-10:])
+                    if len(summary_text) == 10:
+                        break
+            summary = "[Compacted]\n" + "\n".join(reversed(summary_text))
 
-        self.session.messages = [
-            {"role": "system", "content": summary, "ts": 0}
-        ] + recent
-        self.session.save()
+        msgs[:n - 4] = [{"role": "system", "content": summary, "ts": 0}]
+        # Full rewrite of the session file; keep it off the event loop
+        await asyncio.to_thread(self.session.save)
         logger.info(f"Compacted to {len(self.session.messages)} messages")
 
-    async def _llm_summarize(self, messages: list) -> str:
+    async def _llm_summarize(self, messages: Iterable[Dict]) -> str:
         """Use LLM to summarize old messages for compaction."""
         if not (self.providers.active and self.providers.active.ready):
             return ""
@@ -636,7 +690,7 @@ class XiaClaw:
 
         for round_num in range(max_rounds):
             ctx = self.session.get_context_window(self.config.max_context_tokens)
-            all_msgs = [sys_msg] + ctx
+            all_msgs = [sys_msg, *ctx]
 
             if stream and round_num > 0:
                 # After tool calls, try streaming the final response directly
@@ -659,7 +713,7 @@ class XiaClaw:
                             full += content
                             yield content
                     if full is not None:
-                        text = _THINK_RE.sub('', full).strip()
+                        text = strip_think(full)
                         if text:
                             self.session.add_message("assistant", text)
                         return
@@ -707,7 +761,7 @@ class XiaClaw:
                     try:
                         await self.hooks.fire("before_tool_call", tool=name, args=args)
                         self.security.log_tool_call(name, args)
-                        result = str(self.tools.call(name, args) or "")
+                        result = str(await self.tools.acall(name, args) or "")
                         self.stats.record_tool()
                         await self.hooks.fire("after_tool_call", tool=name, args=args, result=result)
                         logger.info(f"Tool: {name}({list(args.keys())}) → {len(result)} chars")
@@ -736,7 +790,7 @@ class XiaClaw:
 
             # Final text response (no tool calls)
             text = choice.message.content or ""
-            text = _THINK_RE.sub('', text).strip()
+            text = strip_think(text)
             if text:
                 self.session.add_message("assistant", text)
 
@@ -750,19 +804,42 @@ class XiaClaw:
 
         yield "[Agent loop exceeded max rounds]"
 
+    def _start_message_hooks(self, message: str) -> Optional[asyncio.Task]:
+        """Schedule message_received hooks as a task (None when nothing is registered)."""
+        if not self.hooks.has("message_received"):
+            return None
+        # Observers only (the result is unused), so all of them run at once
+        return asyncio.create_task(self.hooks.fire("message_received", concurrent=True, message=message))
+
+    @staticmethod
+    def _drop_task(task: Optional[asyncio.Task]):
+        """Cancel a task we won't await; if it already finished, retrieve its
+        outcome so an exception isn't reported as never retrieved."""
+        if task is None or task.cancel():
+            return
+        if not task.cancelled():
+            task.exception()
+
     async def handle_message(self, message: str, user_id: str = "default") -> str:
         """Process a user message, return full response."""
         if not self.rate_limiter.check(user_id):
             return "⚠️ Rate limited. Please wait a moment."
         self._check_config_reload()
-        await self.hooks.fire("message_received", message=message)
-        self.skills.activate_for_message(message)
-
-        session = self._get_user_session(user_id)
-        session.add_message("user", message)
-        orig_session = self.session
-        self.session = session
-        await self._compact()
+        # Hooks overlap with session bookkeeping/compaction; joined before the LLM call
+        hook_task = self._start_message_hooks(message)
+        try:
+            self.skills.activate_for_message(message)
+
+            session = self._get_user_session(user_id)
+            session.add_message("user", message)
+            orig_session = self.session
+            self.session = session
+            await self._compact()
+        except BaseException:
+            self._drop_task(hook_task)
+            raise
+        if hook_task:
+            await hook_task
 
         if not (self.providers.active and self.providers.active.ready):
             self.session = orig_session
@@ -779,14 +856,20 @@ class XiaClaw:
         if not self.rate_limiter.check(user_id):
             yield "⚠️ Rate limited. Please wait a moment."; return
         self._check_config_reload()
-        await self.hooks.fire("message_received", message=message)
-        self.skills.activate_for_message(message)
-
-        session = self._get_user_session(user_id)
-        session.add_message("user", message)
-        orig_session = self.session
-        self.session = session
-        await self._compact()
+        hook_task = self._start_message_hooks(message)
+        try:
+            self.skills.activate_for_message(message)
+
+            session = self._get_user_session(user_id)
+            session.add_message("user", message)
+            orig_session = self.session
+            self.session = session
+            await self._compact()
+        except BaseException:
+            self._drop_task(hook_task)
+            raise
+        if hook_task:
+            await hook_task
 
         if not (self.providers.active and self.providers.active.ready):
             self.session = orig_session
@@ -1,5 +1,6 @@
 """xiaoclaw Memory System - Compatible with OpenClaw memory format"""
 import logging
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -8,6 +9,17 @@ logger = logging.getLogger("xiaoclaw.Memory")
 
 DEFAULT_WORKSPACE = Path(".")
 
+# Workspace context files injected into the system prompt
+BOOTSTRAP_FILES = ("AGENTS.md", "SOUL.md", "USER.md", "IDENTITY.md")
+
+
+def _read_text(fp: Path) -> str:
+    """File content, or "" if it doesn't exist (one open() instead of exists() + read)."""
+    try:
+        return fp.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
 
 class MemoryManager:
     """Manages MEMORY.md + memory/YYYY-MM-DD.md files."""
@@ -61,7 +73,7 @@ class MemoryManager:
                 if not line.strip():
                     continue
                 lower = line.lower()
-                score = sum(1 for kw in keywords if kw in lower)
+                score = sum(map(lower.__contains__, keywords))
                 if score > 0:
                     try:
                         rel_path = str(filepath.relative_to(self.workspace))
@@ -102,18 +114,13 @@ class MemoryManager:
 
     def read_memory(self) -> str:
         """Read MEMORY.md content."""
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
-        return ""
+        return _read_text(self.memory_file)
 
     def read_daily(self, date: Optional[str] = None) -> str:
         """Read memory/YYYY-MM-DD.md for given date (default: today)."""
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
-        fp = self.memory_dir / f"{date}.md"
-        if fp.exists():
-            return fp.read_text(encoding="utf-8")
-        return ""
+        return _read_text(self.memory_dir / f"{date}.md")
 
     def read_recent_daily(self, days: int = 2) -> Dict[str, str]:
         """Read recent daily memory files."""
@@ -144,7 +151,7 @@ class MemoryManager:
         if date is None:
             date = datetime.now().strftime("%Y-%m-%d")
         fp = self.memory_dir / f"{date}.md"
-        existing = fp.read_text(encoding="utf-8") if fp.exists() else f"# {date}\n"
+        existing = _read_text(fp) or f"# {date}\n"
         fp.write_text(existing.rstrip() + "\n\n" + text.strip() + "\n", encoding="utf-8")
         logger.info(f"Daily memory updated: {date}")
 
@@ -175,11 +182,16 @@ class MemoryManager:
     def read_bootstrap_files(self) -> Dict[str, str]:
         """Read AGENTS.md, SOUL.md, USER.md, IDENTITY.md for system prompt."""
         files = {}
-        for name in ["AGENTS.md", "SOUL.md", "USER.md", "IDENTITY.md"]:
-            fp = self.workspace / name
-            if fp.exists():
+        # One directory scan, then read only the files that are there
+        try:
+            with os.scandir(self.workspace) as it:
+                present = {e.name: e.path for e in it if e.name in BOOTSTRAP_FILES}
+        except OSError:
+            return files
+        for name in BOOTSTRAP_FILES:
+            if name in present:
                 try:
-                    files[name] = fp.read_text(encoding="utf-8")
+                    files[name] = Path(present[name]).read_text(encoding="utf-8")
                 except Exception:
                     pass
         return files
@@ -169,6 +169,7 @@ class PluginManager:
             # Register tools
             for name, func in p.tools.items():
                 claw.tools.tools[name] = {"func": func, "description": f"Plugin: {p.name}"}
+                claw.tools.version += 1
                 logger.info(f"Plugin tool registered: {name} (from {p.name})")
             # Register hooks
             for event, func in p.hooks.items():
@@ -3,8 +3,8 @@ import os
 import time
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Sequence
+from dataclasses import dataclass
 
 try:
     import yaml
@@ -26,7 +26,7 @@ class ProviderConfig:
     name: str
     api_key: str
     base_url: str
-    models: List[str] = field(default_factory=list)
+    models: Sequence[str] = ()  # read-only, so a shared tuple default needs no factory
     default_model: str = ""
     provider_type: str = "openai"  # openai | anthropic
 
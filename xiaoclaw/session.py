@@ -1,5 +1,7 @@
 """xiaoclaw Session Management - JSONL persistence compatible with OpenClaw"""
+import functools
 import json
+import os
 import time
 import uuid
 import logging
@@ -12,6 +14,12 @@ try:
 except ImportError:
     HAS_TIKTOKEN = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 import re as _re
 
 logger = logging.getLogger("xiaoclaw.Session")
@@ -21,22 +29,46 @@ _SAFE_SESSION_ID = _re.compile(r'^[a-zA-Z0-9_-]+$')
 
 DEFAULT_SESSIONS_DIR = Path(".xiaoclaw/sessions")
 
+def _json_line(obj: Dict) -> bytes:
+    """One UTF-8 JSONL line (non-ASCII kept as-is, like ensure_ascii=False)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
 # Cache for tiktoken encoders to avoid expensive re-initialization
 _encoder_cache = {}
 
 
+# Every turn re-counts the whole history for compaction, so short texts are
+# memoized (hashes of the same str objects are cached). Texts above the limit
+# bypass the cache so it never pins large tool outputs in memory.
+_TOKEN_CACHE_MAX_CHARS = 8192
+
+
 def count_tokens(text: str, model: str = "gpt-4") -> int:
     """Count tokens using tiktoken, fallback to char estimate."""
+    if len(text) > _TOKEN_CACHE_MAX_CHARS:
+        return _count_tokens(text, model)
+    return _count_tokens_cached(text, model)
+
+
+def _count_tokens(text: str, model: str) -> int:
     if HAS_TIKTOKEN:
         try:
             if model not in _encoder_cache:
                 _encoder_cache[model] = tiktoken.encoding_for_model(model)
             return len(_encoder_cache[model].encode(text))
         except (ImportError, KeyError, UnicodeDecodeError):
-            logger.debug(f"tiktoken encoding failed for model {model}, using estimate")
+            logger.debug("tiktoken encoding failed for model %s, using estimate", model)
     return len(text) // 3  # rough estimate
 
 
+_count_tokens_cached = functools.lru_cache(maxsize=1024)(_count_tokens)
+
+
 def count_messages_tokens(messages: List[Dict], model: str = "gpt-4") -> int:
     total = 0
     for msg in messages:
@@ -86,17 +118,16 @@ class Session:
     def _append_line(self, data: Dict):
         """Append a single JSONL line to the session file."""
         self._file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        with open(self._file, "ab") as f:
+            f.write(_json_line(data))
 
     def save(self):
         """Full save (rewrite entire file)."""
         self._file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._file, "w", encoding="utf-8") as f:
+        with open(self._file, "wb") as f:
             # First line is metadata (use unique sentinel to avoid false positives)
-            f.write(json.dumps({"_xc_meta": True, **self.metadata}, ensure_ascii=False) + "\n")
-            for msg in self.messages:
-                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+            f.write(_json_line({"_xc_meta": True, **self.metadata}))
+            f.writelines(map(_json_line, self.messages))
 
     def load(self) -> bool:
         """Load session from JSONL file."""
@@ -104,10 +135,10 @@ class Session:
             return False
         self.messages.clear()
         try:
-            for line in self._file.read_text(encoding="utf-8").strip().split("\n"):
+            for line in self._file.read_bytes().splitlines():
                 if not line.strip():
                     continue
-                data = json.loads(line)
+                data = _json_loads(line)
                 # Use unique sentinel to avoid false positives from user messages
                 if data.get("_xc_meta"):
                     self.metadata.update(data)
@@ -207,21 +238,26 @@ class SessionManager:
 
     def list_sessions(self) -> List[Dict[str, Any]]:
         result = []
-        if not self.sessions_dir.exists():
+        # One scandir pass + one stat per file; only the metadata line is read
+        try:
+            with os.scandir(self.sessions_dir) as it:
+                entries = [(e, e.stat()) for e in it if e.name.endswith(".jsonl") and e.is_file()]
+        except FileNotFoundError:
             return result
-        for f in sorted(self.sessions_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True):
-            sid = f.stem
+        entries.sort(key=lambda es: es[1].st_mtime, reverse=True)
+        for entry, st in entries:
             try:
-                first_line = f.read_text(encoding="utf-8").split("\n")[0]
-                meta = json.loads(first_line) if first_line else {}
+                with open(entry.path, encoding="utf-8") as f:
+                    first_line = f.readline().strip()
+                meta = _json_loads(first_line) if first_line else {}
             except (OSError, json.JSONDecodeError):
                 meta = {}
             # Check for both old (_meta) and new (_xc_meta) sentinel
             result.append({
-                "session_id": sid,
-                "file": str(f),
-                "size": f.stat().st_size,
-                "modified": f.stat().st_mtime,
+                "session_id": entry.name[:-len(".jsonl")],
+                "file": entry.path,
+                "size": st.st_size,
+                "modified": st.st_mtime,
                 "meta": meta if meta.get("_meta") or meta.get("_xc_meta") else {},
             })
         return result
@@ -1,8 +1,10 @@
 """xiaoclaw Skill System - Compatible with OpenClaw ClawHub format"""
 import re
 import logging
+import functools
 import importlib
 import importlib.util
+import inspect
 from pathlib import Path
 from typing import Dict, Optional, List, Callable
 from dataclasses import dataclass, field
@@ -111,7 +113,7 @@ def should_activate(meta: SkillMeta, user_message: str) -> bool:
         return False
 
     # Count matches
-    match_count = sum(1 for kw in keywords if kw in msg_lower)
+    match_count = sum(map(msg_lower.__contains__, keywords))
     
     # Activate if:
     # - At least 2 keywords match, OR
@@ -245,8 +247,54 @@ class SkillRegistry:
             logger.error(f"Failed to load {filepath}: {e}")
 
 
-def create_skill(name: str, description: str, tools: Optional[Dict] = None) -> Skill:
-    return Skill(name=name, description=description, tools=tools or {})
+def jit_skill(fn: Callable) -> Callable:
+    """Wrap a numeric skill tool with a Numba @njit fast path.
+
+    Falls back to plain Python when numba isn't installed or can't type the
+    function (e.g. it takes **kwargs or works on strings). Exceptions raised
+    by the tool itself propagate as usual; the tool never runs twice.
+    """
+    try:
+        from numba import njit
+        from numba.core.errors import NumbaError
+    except ImportError:
+        logger.debug(f"numba not installed; {fn.__name__} runs in pure Python")
+        return fn
+
+    # nopython mode has no *args/**kwargs: not eligible, decided up front
+    if any(p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+           for p in inspect.signature(fn).parameters.values()):
+        logger.debug(f"{fn.__name__} takes *args/**kwargs; runs in pure Python")
+        return fn
+
+    try:
+        jitted = njit(cache=True)(fn)
+    except RuntimeError:
+        # No source file to key the on-disk cache on (e.g. exec'd code)
+        jitted = njit(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        nonlocal jitted
+        if jitted is not None:
+            try:
+                return jitted(*args, **kwargs)
+            except NumbaError as e:
+                # Typing/compilation failed, so the body never ran: fall back
+                # for good. Errors from the tool body (or bad arguments) are
+                # not NumbaErrors and propagate untouched.
+                logger.warning(f"JIT disabled for {fn.__name__}: {e}")
+                jitted = None
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def create_skill(name: str, description: str, tools: Optional[Dict] = None, jit: bool = False) -> Skill:
+    tools = tools or {}
+    if jit:
+        tools = {k: jit_skill(f) for k, f in tools.items()}
+    return Skill(name=name, description=description, tools=tools)
 
 
 def register_builtin_skills(registry: SkillRegistry):
@@ -1,4 +1,6 @@
 """xiaoclaw Tool Registry — built-in tools and OpenAI function definitions"""
+import asyncio
+import itertools
 import subprocess
 import re
 import json
@@ -7,9 +9,14 @@ from typing import Dict, Optional, List, Callable
 
 from .web import web_search as _web_search, web_fetch as _web_fetch
 
+_EXEC_MAX_CHARS = 5000  # exec output returned to the model
+_READ_MAX_CHARS = 50000  # per read call; longer files are paged with offset/limit
+
 TOOL_DEFS = [
-    {"name": "read", "desc": "Read a file's contents", "params": {
-        "type": "object", "properties": {"file_path": {"type": "string", "description": "Path to file"}},
+    {"name": "read", "desc": "Read a file's contents (long files in pages via offset/limit)", "params": {
+        "type": "object", "properties": {"file_path": {"type": "string", "description": "Path to file"},
+                                         "offset": {"type": "integer", "description": "First line to read (1-based, default 1)"},
+                                         "limit": {"type": "integer", "description": "Max number of lines (default: up to the size cap)"}},
         "required": ["file_path"]}},
     {"name": "write", "desc": "Write content to a file (creates parent dirs)", "params": {
         "type": "object", "properties": {"file_path": {"type": "string"}, "content": {"type": "string"}},
@@ -67,33 +74,34 @@ TOOL_DEFS = [
 
 class ToolRegistry:
     def __init__(self, security, memory=None, skills_registry=None, workspace=None):
-        self.tools: Dict[str, Dict] = {}
         self.security = security
         self.memory = memory
         self.skills_registry = skills_registry
         self.workspace = Path(workspace).resolve() if workspace else Path.cwd()
         self._disabled: set = set()
+        self.version = 0  # bumped whenever the set of available tools changes
         self._extra_tool_defs: List[Dict] = []  # for skill tools
         self._skills_dir: Optional[Path] = None
-        for n, f, d in [
-            ("read", self._read, "Read file"),
-            ("write", self._write, "Write file"),
-            ("edit", self._edit, "Edit file"),
-            ("exec", self._exec, "Run command"),
-            ("web_search", lambda **kw: _web_search(**kw), "Search web"),
-            ("web_fetch", lambda **kw: _web_fetch(**kw), "Fetch URL"),
-            ("memory_search", self._memory_search, "Search memory"),
-            ("memory_get", self._memory_get, "Get memory"),
-            ("memory_save", self._memory_save, "Save to memory"),
-            ("list_dir", self._list_dir, "List directory"),
-            ("find_files", self._find_files, "Find files"),
-            ("grep", self._grep, "Search file contents"),
-            ("clawhub_search", self._clawhub_search, "Search ClawHub"),
-            ("clawhub_install", self._clawhub_install, "Install from ClawHub"),
-            ("clawhub_list", self._clawhub_list, "List ClawHub skills"),
-            ("create_skill", self._create_skill, "Create custom skill"),
-        ]:
-            self.tools[n] = {"func": f, "description": d}
+        # Built-ins as one literal; register_tool() is for skill/plugin tools.
+        # Optional "afunc": non-blocking implementation used by acall() inside the agent loop
+        self.tools: Dict[str, Dict] = {
+            "read": {"func": self._read, "description": "Read file"},
+            "write": {"func": self._write, "description": "Write file"},
+            "edit": {"func": self._edit, "description": "Edit file"},
+            "exec": {"func": self._exec, "afunc": self._exec_async, "description": "Run command"},
+            "web_search": {"func": lambda **kw: _web_search(**kw), "description": "Search web"},
+            "web_fetch": {"func": lambda **kw: _web_fetch(**kw), "description": "Fetch URL"},
+            "memory_search": {"func": self._memory_search, "description": "Search memory"},
+            "memory_get": {"func": self._memory_get, "description": "Get memory"},
+            "memory_save": {"func": self._memory_save, "description": "Save to memory"},
+            "list_dir": {"func": self._list_dir, "description": "List directory"},
+            "find_files": {"func": self._find_files, "description": "Find files"},
+            "grep": {"func": self._grep, "description": "Search file contents"},
+            "clawhub_search": {"func": self._clawhub_search, "description": "Search ClawHub"},
+            "clawhub_install": {"func": self._clawhub_install, "description": "Install from ClawHub"},
+            "clawhub_list": {"func": self._clawhub_list, "description": "List ClawHub skills"},
+            "create_skill": {"func": self._create_skill, "description": "Create custom skill"},
+        }
 
     def _is_within_workspace(self, p: Path) -> bool:
         """Check if path is within workspace (prevent path traversal)."""
@@ -101,7 +109,7 @@ class ToolRegistry:
             resolved = p.resolve()
             return str(resolved).startswith(str(self.workspace))
         except (OSError, ValueError) as e:
-            logger.debug(f"Path resolution failed for {p}: {e}")
+            logger.debug("Path resolution failed for %s: %s", p, e)
             return False
 
     def get(self, name: str): return self.tools.get(name)
@@ -109,9 +117,11 @@ class ToolRegistry:
 
     def disable_tool(self, name: str):
         self._disabled.add(name)
+        self.version += 1
 
     def enable_tool(self, name: str):
         self._disabled.discard(name)
+        self.version += 1
 
     def register_tool(self, name: str, func: Callable, description: str, params: Dict):
         """Register an additional tool (e.g. from skills)."""
@@ -119,23 +129,46 @@ class ToolRegistry:
         self._extra_tool_defs.append({
             "name": name, "desc": description, "params": params
         })
+        self.version += 1
 
-    def call(self, name: str, args: Dict) -> str:
+    def _resolve(self, name: str):
+        """Return (tool, None) or (None, error message)."""
         if name in self._disabled:
-            return f"Error: tool '{name}' is disabled"
+            return None, f"Error: tool '{name}' is disabled"
         tool = self.tools.get(name)
         if not tool:
-            return f"Error: unknown tool '{name}'. Available: {', '.join(self.list_names())}"
-        try:
-            return str(tool["func"](**args))
-        except TypeError as e:
+            return None, f"Error: unknown tool '{name}'. Available: {', '.join(self.list_names())}"
+        return tool, None
+
+    @staticmethod
+    def _call_error(name: str, e: Exception) -> str:
+        if isinstance(e, TypeError):
             return f"Error calling {name}: bad arguments — {e}"
-        except PermissionError as e:
+        if isinstance(e, PermissionError):
             return f"Error calling {name}: permission denied — {e}"
-        except FileNotFoundError as e:
+        if isinstance(e, FileNotFoundError):
             return f"Error calling {name}: file not found — {e}"
+        return f"Error calling {name}: {type(e).__name__}: {e}"
+
+    def call(self, name: str, args: Dict) -> str:
+        tool, err = self._resolve(name)
+        if err:
+            return err
+        try:
+            return str(tool["func"](**args))
         except Exception as e:
-            return f"Error calling {name}: {type(e).__name__}: {e}"
+            return self._call_error(name, e)
+
+    async def acall(self, name: str, args: Dict) -> str:
+        """Like call(), but awaits the tool's "afunc" when it has one (e.g. exec)."""
+        tool, err = self._resolve(name)
+        if err:
+            return err
+        try:
+            afunc = tool.get("afunc")
+            return str(await afunc(**args) if afunc else tool["func"](**args))
+        except Exception as e:
+            return self._call_error(name, e)
 
     def get_all_tool_defs(self) -> List[Dict]:
         """Get all tool definitions (built-in + extra from skills)."""
@@ -147,13 +180,37 @@ class ToolRegistry:
             "name": t["name"], "description": t["desc"], "parameters": t["params"],
         }} for t in all_defs if t["name"] not in self._disabled]
 
-    def _read(self, file_path="", path="", **kw) -> str:
+    def _read(self, file_path="", path="", offset=1, limit=0, **kw) -> str:
         p = Path(file_path or path).expanduser().resolve()
         if not self._is_within_workspace(p):
             return "Error: access denied — path outside workspace"
         if not p.exists(): return f"Error: not found: {p}"
-        try: return p.read_text(encoding="utf-8")
+        try: start, limit = max(int(offset or 1), 1), int(limit or 0)
+        except (TypeError, ValueError): return "Error: offset and limit must be integers"
+        parts, left, n = [], _READ_MAX_CHARS, 0
+        try:
+            with p.open(encoding="utf-8", errors="replace") as f:
+                for _ in itertools.islice(f, start - 1):
+                    pass
+                while limit <= 0 or n < limit:
+                    # readline(size) keeps one huge line from being read whole
+                    line = f.readline(left + 1)
+                    if not line:
+                        break
+                    if len(line) > left:
+                        if not parts:  # a single line longer than the cap
+                            return line[:left] + (
+                                f"\n... (line {start} truncated at {left} chars; "
+                                f"the rest of this line cannot be read, "
+                                f"read with offset={start + 1} for the next line)")
+                        return "".join(parts) + (
+                            f"\n... (truncated, {p.stat().st_size} bytes total; "
+                            f"read with offset={start + n} to continue)")
+                    parts.append(line)
+                    left -= len(line)
+                    n += 1
         except Exception as e: return f"Error: {e}"
+        return "".join(parts)
 
     def _write(self, file_path="", path="", content="", **kw) -> str:
         p = Path(file_path or path).expanduser().resolve()
@@ -168,17 +225,39 @@ class ToolRegistry:
             return "Error: access denied — path outside workspace"
         if not p.exists(): return f"Error: not found: {p}"
         text = p.read_text(encoding="utf-8")
-        if old_string not in text: return "Error: old_string not found in file"
-        p.write_text(text.replace(old_string, new_string, 1), encoding="utf-8"); return f"Edited: {p}"
+        # One scan: find() both checks presence and locates the first match
+        i = text.find(old_string)
+        if i < 0: return "Error: old_string not found in file"
+        p.write_text(text[:i] + new_string + text[i + len(old_string):], encoding="utf-8"); return f"Edited: {p}"
 
     def _exec(self, command="", **kw) -> str:
         if self.security.is_dangerous(command): return f"Blocked: dangerous command"
         try:
-            r = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=30)
-            return ((r.stdout + r.stderr).strip() or "(no output)")[:5000]
+            r = subprocess.run(command, shell=True, capture_output=True, timeout=30)
+            return self._exec_output(r.stdout + r.stderr)
         except subprocess.TimeoutExpired: return "Error: command timed out (30s)"
         except Exception as e: return f"Error: {e}"
 
+    async def _exec_async(self, command="", **kw) -> str:
+        if self.security.is_dangerous(command): return f"Blocked: dangerous command"
+        try:
+            proc = await asyncio.create_subprocess_shell(
+                command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        except Exception as e: return f"Error: {e}"
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return "Error: command timed out (30s)"
+        return self._exec_output(out)
+
+    @staticmethod
+    def _exec_output(out: bytes) -> str:
+        # Decode only what can survive the cut (UTF-8 is at most 4 bytes/char)
+        text = out[:_EXEC_MAX_CHARS * 4].decode("utf-8", "replace").strip()
+        return (text or "(no output)")[:_EXEC_MAX_CHARS]
+
     def _memory_search(self, query="", **kw) -> str:
         if not self.memory: return "Error: memory not configured"
         results = self.memory.memory_search(query)
@@ -1,9 +1,12 @@
 """xiaoclaw Utilities — SecurityManager, RateLimiter, TokenStats, HookManager"""
 import asyncio
+import atexit
+import concurrent.futures
 import logging
+import threading
 import time as _time
 from pathlib import Path
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, Iterator, Tuple
 
 logger = logging.getLogger("xiaoclaw")
 
@@ -29,6 +32,13 @@ DANGEROUS_REGEX = [
     _re.compile(r'rm\s+-[a-z]*f[a-z]*r', _re.IGNORECASE),
 ]
 
+# All of the above folded into one case-insensitive alternation: a single
+# scan of the command instead of one substring probe / search per pattern
+_DANGEROUS_RE = _re.compile(
+    "|".join([_re.escape(p) for p in DANGEROUS_EXACT] + [r.pattern for r in DANGEROUS_REGEX]),
+    _re.IGNORECASE,
+)
+
 
 class SecurityManager:
     def __init__(self, level: str = "strict", workspace: Path = Path(".")):
@@ -41,12 +51,7 @@ class SecurityManager:
     def is_dangerous(self, action: str) -> bool:
         if self.level == "relaxed":
             return False
-        lower = action.lower()
-        # Check exact substring matches
-        dangerous = any(p in lower for p in DANGEROUS_EXACT)
-        # Check regex patterns
-        if not dangerous:
-            dangerous = any(r.search(action) for r in DANGEROUS_REGEX)
+        dangerous = _DANGEROUS_RE.search(action) is not None
         if dangerous:
             self._audit("BLOCKED", action)
         return dangerous
@@ -86,9 +91,69 @@ class SecurityManager:
         self._audit("TOOL", f"{tool}({list(args.keys())})")
 
 
-# ─── Rate Limiter ─────────────────────────────────────
+# ─── Text ─────────────────────────────────────────────
 
-import threading
+# Compiled once; reasoning models wrap chain-of-thought in <think>…</think>
+_THINK_RE = _re.compile(r'<think>.*?</think>\s*', _re.DOTALL)
+
+
+def strip_think(text: str) -> str:
+    """Drop <think> blocks and surrounding whitespace from a model reply."""
+    if "<think>" in text:  # plain substring test skips the regex for most replies
+        text = _THINK_RE.sub('', text)
+    return text.strip()
+
+
+def chunk_text(text: str, size: int) -> Iterator[str]:
+    """Yield consecutive pieces of at most `size` chars (for platform message limits)."""
+    i, n = 0, len(text)
+    while i < n:
+        yield text[i:i + size]
+        i += size
+
+
+# ─── Event Loop ───────────────────────────────────────
+
+def install_uvloop() -> bool:
+    """Make new event loops use uvloop when it is installed (xiaoclaw[fast])."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.debug("Using uvloop event loop")
+    return True
+
+
+# One daemon thread running a long-lived loop, shared by every sync→async
+# bridge (e.g. battle tool calls) instead of a thread pool per call
+_bg_loop = None
+_bg_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _bg_loop
+    with _bg_lock:
+        if _bg_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="xiaoclaw-loop", daemon=True).start()
+            atexit.register(loop.call_soon_threadsafe, loop.stop)
+            _bg_loop = loop
+        return _bg_loop
+
+
+def run_coro_sync(coro, timeout: float = None):
+    """Run a coroutine from sync code (even inside a running loop) and return its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, background_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+# ─── Rate Limiter ─────────────────────────────────────
 
 class RateLimiter:
     """Simple token-bucket rate limiter with thread safety."""
@@ -175,22 +240,65 @@ class TokenStats:
 class HookManager:
     """before_tool_call / after_tool_call / message_received hooks.
     
-    Note: fire() returns the result of the first hook that returns a non-None
-    value, silently skipping remaining hooks (first-non-None-wins semantics).
+    Note: fire() runs hooks in registration order and returns the result of
+    the first hook that returns a non-None value, skipping the remaining hooks
+    (first-non-None-wins semantics). With concurrent=True every hook runs —
+    sync ones inline, async ones concurrently — and the first non-None result
+    in registration order is returned. Exceptions from hooks are logged and
+    skipped, but CancelledError (and any other BaseException) propagates.
     """
 
+    _PENDING = object()
+
     def __init__(self):
-        self._hooks: Dict[str, List[Callable]] = {}
+        self._hooks: Dict[str, List[Tuple[Callable, bool]]] = {}  # event → [(fn, is_async)]
 
     def register(self, event: str, fn: Callable):
-        self._hooks.setdefault(event, []).append(fn)
-
-    async def fire(self, event: str, **kwargs) -> Any:
-        for fn in self._hooks.get(event, []):
+        # Classified once here rather than on every fire()
+        self._hooks.setdefault(event, []).append((fn, asyncio.iscoroutinefunction(fn)))
+
+    def has(self, event: str) -> bool:
+        return bool(self._hooks.get(event))
+
+    async def fire(self, event: str, *, concurrent: bool = False, **kwargs) -> Any:
+        hooks = self._hooks.get(event)
+        if not hooks:
+            return None
+        if not concurrent:
+            for fn, is_async in hooks:
+                try:
+                    r = await fn(**kwargs) if is_async else fn(**kwargs)
+                    if r is not None:
+                        return r
+                except Exception as e:
+                    logger.error(f"Hook '{event}' error: {e}")
+            return None
+
+        outcomes, coros = [], []
+        for fn, is_async in hooks:
             try:
-                r = fn(**kwargs) if not asyncio.iscoroutinefunction(fn) else await fn(**kwargs)
-                if r is not None:
-                    return r
+                r = fn(**kwargs)
             except Exception as e:
-                logger.error(f"Hook '{event}' error: {e}")
-        return None
+                r = e
+            except BaseException:
+                for c in coros:  # not going to await them
+                    c.close()
+                raise
+            if is_async and not isinstance(r, Exception):
+                coros.append(r)
+                r = self._PENDING
+            outcomes.append(r)
+        if coros:
+            done = iter(await asyncio.gather(*coros, return_exceptions=True))
+            outcomes = [next(done) if r is self._PENDING else r for r in outcomes]
+
+        for r in outcomes:
+            if isinstance(r, BaseException) and not isinstance(r, Exception):
+                raise r  # CancelledError etc. are not hook errors
+        result = None
+        for r in outcomes:
+            if isinstance(r, Exception):
+                logger.error(f"Hook '{event}' error: {r}")
+            elif result is None:
+                result = r
+        return result
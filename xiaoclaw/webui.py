@@ -1,9 +1,12 @@
 """xiaoclaw Web UI — modern chat interface with FastAPI backend"""
 import logging
+import re
 from typing import Optional
 
 logger = logging.getLogger("xiaoclaw.WebUI")
 
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
 from dataclasses import asdict
 
 try:
@@ -457,8 +460,7 @@ def create_webui(claw=None):
     @app.get("/api/analytics/daily/{date}")
     async def get_daily_analytics(date: str):
         """Get analytics for a specific date."""
-        import re
-        if not re.match(r'^\d{4}-\d{2}-\d{2}$', date):
+        if not _DATE_RE.match(date):
             return {"error": "Invalid date format, use YYYY-MM-DD"}
         daily = claw.analytics.get_daily_stats(date)
         return asdict(daily) if daily else {"error": "No data for date"}